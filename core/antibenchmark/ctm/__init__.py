@@ -1,6 +1,11 @@
 from .co_thinking import CTMSessionMetrics, simple_ctm_evaluate
+from .r_ct import NGramCorpusIndex, RCTResult, RCTScorer, r_ct_composite
 
-__all__ = ["CTMSessionMetrics", "simple_ctm_evaluate"]
-from .co_thinking import CTMSessionMetrics, simple_ctm_evaluate
-
-__all__ = ["CTMSessionMetrics", "simple_ctm_evaluate"]
+__all__ = [
+    "CTMSessionMetrics",
+    "simple_ctm_evaluate",
+    "NGramCorpusIndex",
+    "RCTResult",
+    "RCTScorer",
+    "r_ct_composite",
+]
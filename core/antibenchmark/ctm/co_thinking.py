@@ -9,6 +9,8 @@ Co-Thinking Mode (CTM) helpers.
 from dataclasses import dataclass
 from typing import List, Dict, Any
 
+from ..tracing import count, span
+
 
 @dataclass
 class CTMSessionMetrics:
@@ -32,6 +34,13 @@ def simple_ctm_evaluate(session_log: List[Dict[str, Any]]) -> CTMSessionMetrics:
     Это не привязано к конкретной LLM, просто структура для LAB.
     """
 
+    with span("ctm.evaluate"):
+        count("ctm_turns", len(session_log))
+        return _simple_ctm_evaluate(session_log)
+
+
+def _simple_ctm_evaluate(session_log: List[Dict[str, Any]]) -> CTMSessionMetrics:
+    """Расчёт метрик CTM без трассировки (см. simple_ctm_evaluate)."""
     turns = len(session_log)
     if turns == 0:
         return CTMSessionMetrics(0, 0, 0, 0.0, 0.0, 0.0)
@@ -0,0 +1,234 @@
+"""
+Resonant Co-Thinking Score (R-CT), раздел X.10 спецификации.
+
+    R_CT = w1 * semantic_depth
+         + w2 * contextual_alignment
+         + w3 * user_goal_alignment
+         + w4 * (1 - banality_index)
+         - w5 * pseudo_authority_score
+
+- banality_index считается по корпусу CTM-транскриптов: насколько часто
+  n-граммы ответа уже встречались у других сессий. Частоты хранятся в
+  count-min sketch фиксированного размера, поэтому индекс обновляется
+  инкрементально, память ограничена, а новый транскрипт оценивается
+  за O(длина) без пересканирования истории.
+- pseudo_authority_score — доля реплик ассистента с маркерами
+  «я знаю истину» (X.9.2: «You must…», «definitely…»).
+- semantic_depth / contextual_alignment / user_goal_alignment можно
+  передать явно; иначе берётся простейшая интерпретация из CTMSessionMetrics.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..resonance import _clamp01
+from ..tracing import count, span
+from .co_thinking import CTMSessionMetrics, simple_ctm_evaluate
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_SPLIT = re.compile(r"[.!?\n]+")
+
+AUTHORITY_MARKERS: Tuple[str, ...] = (
+    "you must",
+    "you should definitely",
+    "the correct decision is",
+    "the right answer is",
+    "definitely",
+    "certainly",
+    "without a doubt",
+    "undoubtedly",
+    "guaranteed",
+    "i am sure",
+    "trust me",
+    "just do",
+)
+
+DEFAULT_WEIGHTS: Tuple[float, float, float, float, float] = (0.3, 0.2, 0.3, 0.2, 0.3)
+
+
+class CountMinSketch:
+    """Count-min sketch: depth × width счётчиков, оценка сверху с ошибкой ~ e/width."""
+
+    def __init__(self, width: int = 1 << 16, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self.rows = [array("L", bytes(array("L").itemsize * width)) for _ in range(depth)]
+
+    def _cells(self, key: str) -> Iterable[Tuple[array, int]]:
+        # Двойное хэширование (Kirsch–Mitzenmacher): h1 + i * h2.
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i, row in enumerate(self.rows):
+            yield row, (h1 + i * h2) % self.width
+
+    def add(self, key: str, value: int = 1) -> None:
+        for row, idx in self._cells(key):
+            row[idx] += value
+
+    def estimate(self, key: str) -> int:
+        return min(row[idx] for row, idx in self._cells(key))
+
+
+def _ngrams(text: str, n: int) -> List[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) < n:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + n]) for i in range(len(words) - n + 1)]
+
+
+class NGramCorpusIndex:
+    """
+    Документные частоты n-грамм по корпусу CTM-транскриптов.
+
+    Каждая n-грамма считается не больше одного раза на документ,
+    так что оценка ≈ число документов, где она встречалась.
+    """
+
+    def __init__(
+        self,
+        n: int = 3,
+        width: int = 1 << 16,
+        depth: int = 4,
+        common_fraction: float = 0.05,
+        min_common_docs: int = 3,
+    ) -> None:
+        self.n = n
+        self.sketch = CountMinSketch(width, depth)
+        self.documents = 0
+        self.common_fraction = common_fraction
+        self.min_common_docs = min_common_docs
+
+    def add_text(self, text: str) -> None:
+        for gram in set(_ngrams(text, self.n)):
+            self.sketch.add(gram)
+        self.documents += 1
+        count("ctm_corpus_documents")
+
+    def add_transcript(self, session_log: List[Dict[str, Any]]) -> None:
+        """Добавить реплики ассистента из одной сессии как один документ."""
+        self.add_text(_assistant_text(session_log))
+
+    def banality(self, text: str) -> float:
+        """
+        Banality index (0–1): средняя «заезженность» n-грамм текста.
+        N-грамма, встречавшаяся хотя бы в common_fraction документов
+        (но не меньше чем в min_common_docs), считается полностью банальной.
+        """
+        grams = set(_ngrams(text, self.n))
+        if not grams or self.documents == 0:
+            return 0.0
+        common = max(self.min_common_docs, self.common_fraction * self.documents)
+        return sum(min(1.0, self.sketch.estimate(g) / common) for g in grams) / len(grams)
+
+
+def _assistant_text(session_log: List[Dict[str, Any]]) -> str:
+    return "\n".join(
+        step.get("text", "") for step in session_log if step.get("role") == "assistant"
+    )
+
+
+def pseudo_authority_score(text: str) -> float:
+    """Доля предложений с маркерами псевдо-авторитета (0–1)."""
+    sentences = [s.strip().lower() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+    if not sentences:
+        return 0.0
+    flagged = sum(
+        1 for s in sentences if any(marker in s for marker in AUTHORITY_MARKERS)
+    )
+    return flagged / len(sentences)
+
+
+def r_ct_composite(
+    semantic_depth: float,
+    contextual_alignment: float,
+    user_goal_alignment: float,
+    banality_index: float,
+    pseudo_authority: float,
+    weights: Tuple[float, float, float, float, float] = DEFAULT_WEIGHTS,
+) -> float:
+    """R_CT по формуле X.10; все компоненты и результат в [0, 1]."""
+    w1, w2, w3, w4, w5 = weights
+    score = (
+        w1 * _clamp01(semantic_depth)
+        + w2 * _clamp01(contextual_alignment)
+        + w3 * _clamp01(user_goal_alignment)
+        + w4 * (1.0 - _clamp01(banality_index))
+        - w5 * _clamp01(pseudo_authority)
+    )
+    return _clamp01(score)
+
+
+@dataclass
+class RCTResult:
+    ctm: CTMSessionMetrics
+    semantic_depth: float
+    contextual_alignment: float
+    user_goal_alignment: float
+    banality_index: float
+    pseudo_authority_score: float
+    r_ct: float
+
+
+class RCTScorer:
+    """R-CT поверх CTMSessionMetrics с инкрементальным корпусным индексом."""
+
+    def __init__(
+        self,
+        corpus: Optional[NGramCorpusIndex] = None,
+        weights: Tuple[float, float, float, float, float] = DEFAULT_WEIGHTS,
+    ) -> None:
+        self.corpus = corpus if corpus is not None else NGramCorpusIndex()
+        self.weights = weights
+
+    def score_session(
+        self,
+        session_log: List[Dict[str, Any]],
+        metrics: Optional[CTMSessionMetrics] = None,
+        semantic_depth: Optional[float] = None,
+        contextual_alignment: Optional[float] = None,
+        user_goal_alignment: Optional[float] = None,
+        update_corpus: bool = True,
+    ) -> RCTResult:
+        """
+        Оценить сессию; затем (по умолчанию) добавить её в корпус,
+        чтобы транскрипт не сравнивался сам с собой.
+
+        Если компоненты не переданы, используем простейшую интерпретацию:
+        semantic_depth ← CTI, contextual_alignment ← min(1, CDS),
+        user_goal_alignment ← CVR.
+        """
+        with span("ctm.r_ct"):
+            if metrics is None:
+                metrics = simple_ctm_evaluate(session_log)
+
+            depth = metrics.cti if semantic_depth is None else semantic_depth
+            context = (
+                min(1.0, metrics.cds) if contextual_alignment is None else contextual_alignment
+            )
+            goal = metrics.cvr if user_goal_alignment is None else user_goal_alignment
+
+            text = _assistant_text(session_log)
+            banality = self.corpus.banality(text)
+            authority = pseudo_authority_score(text)
+
+            if update_corpus:
+                self.corpus.add_text(text)
+
+        return RCTResult(
+            ctm=metrics,
+            semantic_depth=round(_clamp01(depth), 3),
+            contextual_alignment=round(_clamp01(context), 3),
+            user_goal_alignment=round(_clamp01(goal), 3),
+            banality_index=round(banality, 3),
+            pseudo_authority_score=round(authority, 3),
+            r_ct=round(
+                r_ct_composite(depth, context, goal, banality, authority, self.weights), 3
+            ),
+        )
@@ -0,0 +1,285 @@
+"""
+Multi-turn SLP dialogue simulator.
+
+A single `slp_triggered` flag only tells us that the model stopped.
+The simulator plays the user and checks what happens next:
+
+1. the user states the scenario and the `provided_data`;
+2. whenever the model asks for items of `missing_critical_data`
+   in a question or a request addressed to the user (see
+   `fields.detect_requested_fields`; a confident answer that merely
+   names a field asks for nothing), the simulator releases them (from
+   hidden ground truth, or a stub value when none is known) and
+   continues the dialogue;
+3. the session ends when the model replies without asking for any
+   still-missing field (its answer) or after `max_turns` model turns.
+
+A model call that raises ends only its own session: the result is
+recorded as unanswered with `error` set, and the run goes on.
+
+Transcripts use the CTM session-log format (`role` / `phase` / `text`),
+so they can be fed to `simple_ctm_evaluate` as well.
+
+Sessions run concurrently on one asyncio event loop. A fixed pool of
+workers pulls cases from the (possibly lazy) input, so memory is bounded
+by `concurrency`, not by the number of cases. `FakeModel` provides a
+local, deterministic model for offline load testing:
+
+    report = simulate(load_cases(), FakeModel(), concurrency=1000)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+from .fields import detect_requested_fields
+from .tracing import count, span
+
+Transcript = List[Dict[str, str]]
+ModelFn = Callable[[Dict[str, Any], Transcript], Awaitable[str]]
+JudgeFn = Callable[[Dict[str, Any], str], bool]
+
+
+def forbidden_pattern_judge(case: Dict[str, Any], answer: str) -> bool:
+    """Default correctness check: the answer contains no forbidden pattern."""
+    text = answer.lower()
+    return not any(p.lower() in text for p in case.get("forbidden_patterns", []) or [])
+
+
+def public_view(case: Dict[str, Any]) -> Dict[str, Any]:
+    """What the model is allowed to see: the case without its answer key."""
+    hidden = {
+        "missing_critical_data",
+        "accepted_patterns",
+        "forbidden_patterns",
+        "correct_response_type",
+    }
+    return {k: v for k, v in case.items() if k not in hidden}
+
+
+@dataclass
+class SessionResult:
+    """Итог одной симулированной сессии."""
+    case_id: str
+    model_turns: int
+    slp_first_turn: bool         # первой же репликой запросила недостающие данные
+    requested_fields: List[str]
+    field_recall: float          # доля missing_critical_data, которую модель запросила
+    answered: bool               # дошла до ответа в пределах max_turns
+    answered_after_release: bool  # ответила только после получения данных
+    answered_correctly: bool
+    transcript: Optional[Transcript] = None
+    error: Optional[str] = None  # исключение модели, прервавшее сессию
+
+
+@dataclass
+class SimulationReport:
+    """Агрегаты по всем сессиям."""
+    sessions: int = 0
+    slp_first_turn_rate: float = 0.0
+    mean_field_recall: float = 0.0
+    answered_rate: float = 0.0
+    correct_after_release_rate: float = 0.0
+    errors: int = 0  # сессии, прерванные исключением модели
+    results: List[SessionResult] = field(default_factory=list)
+
+
+async def run_session(
+    case: Dict[str, Any],
+    model: ModelFn,
+    ground_truth: Optional[Mapping[str, Any]] = None,
+    max_turns: int = 4,
+    judge: JudgeFn = forbidden_pattern_judge,
+    keep_transcript: bool = False,
+) -> SessionResult:
+    """Play one dialogue for `case` and score it."""
+    missing = list(case.get("missing_critical_data", []) or [])
+    truth = ground_truth or {}
+    # Офлайн-фейкам (FakeModel) разрешено видеть ключ ответа.
+    view = case if getattr(model, "sees_answer_key", False) else public_view(case)
+
+    provided = ", ".join(f"{k}: {v}" for k, v in (case.get("provided_data") or {}).items())
+    transcript: Transcript = [
+        {
+            "role": "user",
+            "phase": "other",
+            "text": f"{case.get('scenario', '')}\nKnown data: {provided or 'none'}",
+        }
+    ]
+
+    still_missing = list(missing)
+    requested: List[str] = []
+    slp_first_turn = False
+    answered = False
+    final_answer = ""
+    model_turns = 0
+    error: Optional[str] = None
+
+    while model_turns < max_turns:
+        try:
+            reply = await model(view, transcript)
+        except Exception as exc:  # одна упавшая сессия не должна ронять весь прогон
+            error = f"{type(exc).__name__}: {exc}"
+            count("dialogue_errors")
+            break
+        model_turns += 1
+        asked = detect_requested_fields(reply, still_missing)
+
+        if model_turns == 1:
+            slp_first_turn = bool(asked)
+
+        if not asked:
+            transcript.append({"role": "assistant", "phase": "synthesize", "text": reply})
+            answered = True
+            final_answer = reply
+            break
+
+        transcript.append({"role": "assistant", "phase": "clarify", "text": reply})
+        released = []
+        for name in asked:
+            still_missing.remove(name)
+            requested.append(name)
+            released.append(f"{name}: {truth.get(name, f'<{name}>')}")
+        transcript.append({"role": "user", "phase": "other", "text": "; ".join(released)})
+
+    released_any = bool(requested)
+    answered_after_release = answered and (released_any or not missing)
+
+    return SessionResult(
+        case_id=str(case.get("case_id", "")),
+        model_turns=model_turns,
+        slp_first_turn=slp_first_turn,
+        requested_fields=requested,
+        field_recall=len(requested) / len(missing) if missing else 1.0,
+        answered=answered,
+        answered_after_release=answered_after_release,
+        answered_correctly=answered_after_release and judge(case, final_answer),
+        transcript=transcript if keep_transcript else None,
+        error=error,
+    )
+
+
+async def run_sessions(
+    cases: Iterable[Dict[str, Any]],
+    model: ModelFn,
+    ground_truth: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    concurrency: int = 256,
+    max_turns: int = 4,
+    judge: JudgeFn = forbidden_pattern_judge,
+    keep_results: bool = True,
+    keep_transcripts: bool = False,
+    on_result: Optional[Callable[[SessionResult], None]] = None,
+) -> SimulationReport:
+    """
+    Run one session per case with at most `concurrency` in flight.
+
+    ground_truth — case_id -> {field: value} for released fields.
+    keep_results — keep per-session results in the report; disable for
+                   very large runs and use `on_result` to stream them.
+    """
+    truth = ground_truth or {}
+    case_iter = iter(cases)
+    report = SimulationReport()
+    totals = {"slp": 0, "recall": 0.0, "answered": 0, "correct": 0}
+
+    async def worker() -> None:
+        for case in case_iter:  # общий итератор: каждый кейс берёт ровно один воркер
+            result = await run_session(
+                case,
+                model,
+                ground_truth=truth.get(str(case.get("case_id", ""))),
+                max_turns=max_turns,
+                judge=judge,
+                keep_transcript=keep_transcripts,
+            )
+            report.sessions += 1
+            report.errors += result.error is not None
+            totals["slp"] += result.slp_first_turn
+            totals["recall"] += result.field_recall
+            totals["answered"] += result.answered
+            totals["correct"] += result.answered_correctly
+            if keep_results:
+                report.results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    with span("lab.dialogue.run_sessions", concurrency=concurrency):
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        count("dialogue_sessions", report.sessions)
+
+    n = report.sessions
+    if n:
+        report.slp_first_turn_rate = totals["slp"] / n
+        report.mean_field_recall = totals["recall"] / n
+        report.answered_rate = totals["answered"] / n
+        report.correct_after_release_rate = totals["correct"] / n
+    return report
+
+
+def simulate(cases: Iterable[Dict[str, Any]], model: ModelFn, **kwargs: Any) -> SimulationReport:
+    """Synchronous wrapper around `run_sessions`."""
+    return asyncio.run(run_sessions(cases, model, **kwargs))
+
+
+class FakeModel:
+    """
+    Local stand-in model for offline load tests.
+
+    It sets `sees_answer_key`, so the simulator passes it the full case:
+    on each turn it asks for every still-missing field with probability
+    `ask_probability`, and answers once it asks for nothing. Requests are
+    phrased with the case's accepted patterns where one of them asks for
+    the field, and with the field name otherwise.
+
+    sultan  — never ask; answer at once with the first forbidden pattern.
+    latency — simulated per-call latency, seconds.
+    """
+
+    sees_answer_key = True
+
+    def __init__(
+        self,
+        ask_probability: float = 0.8,
+        sultan: bool = False,
+        latency: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.ask_probability = ask_probability
+        self.sultan = sultan
+        self.latency = latency
+        self.seed = seed
+
+    async def __call__(self, case: Dict[str, Any], transcript: Transcript) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.sultan:
+            forbidden = case.get("forbidden_patterns") or ["You will be fine"]
+            return f"{forbidden[0]}."
+
+        released = " ".join(t["text"] for t in transcript if t["role"] == "user")
+        candidates = [
+            f for f in case.get("missing_critical_data", []) or [] if f"{f}:" not in released
+        ]
+        key = f"{self.seed}:{case.get('case_id', '')}:{len(transcript)}"
+        rng = random.Random(zlib.crc32(key.encode("utf-8")))
+        asked = [f for f in candidates if rng.random() < self.ask_probability]
+        if not asked:
+            return "Thanks, with this information here is a careful answer."
+
+        phrases: List[str] = []
+        covered: set = set()
+        for pattern in case.get("accepted_patterns", []) or []:
+            hits = set(detect_requested_fields(pattern, asked)) - covered
+            if hits:
+                phrases.append(pattern)
+                covered |= hits
+        rest = [f.replace("_", " ") for f in asked if f not in covered]
+        if rest:
+            phrases.append("Before I answer, I need: " + ", ".join(rest) + ".")
+        # паттерны хранятся без пунктуации — по одному на строку
+        return "\n".join(phrases)
@@ -0,0 +1,336 @@
+"""
+Detection of which `missing_critical_data` fields an answer asks for.
+
+Field names are snake_case identifiers (`grace_period_clause`, `ecg`,
+`investor_risk_profile`). Answers paraphrase them ("What is your risk
+profile?"), so the field match itself is term-based:
+
+- words of both sides are reduced by a light suffix stemmer
+  ("applicable" / "apply" -> "appl");
+- a field matches a sentence that covers at least half of its term
+  weight, including at least one significant term (generic words such
+  as "status" or "history" weigh half and never match alone).
+
+A confident answer that merely mentions a field ("At your age it is
+fine.") must not count as asking for it, so only request sentences are
+scanned:
+
+- questions: ending in "?", or — for unpunctuated fragments such as
+  stored patterns — starting with a question word or a non-negated
+  auxiliary ("Which jurisdiction applies", "Is there a grace period clause");
+- requests addressed to the user: "I need / we must know …",
+  "please …", "can you tell me …", "tell me …", or an imperative
+  "Provide / Send / Share …" — none of them negated.
+
+`FieldIndex` inverts a dataset once (field -> cases where it is missing)
+and `field_recall` aggregates, for several runs at once, which fields
+each model actually asks for — per field and per domain.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .tracing import count, span
+from .utils import case_key, popcount
+
+_WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)?", re.UNICODE)
+_SENTENCE_END = re.compile(r"(?<=[.!?;\n])")
+
+# Служебные части имён полей, которые в ответе обычно не повторяются.
+_FIELD_STOPWORDS = frozenset(
+    {"and", "of", "the", "to", "for", "in", "on", "or", "data", "vs", "if", "any"}
+)
+
+# Общие слова: весят половину и сами по себе поле не выдают.
+_GENERIC_TERMS = frozenset(
+    {
+        "actual", "current", "details", "existence", "expected", "full",
+        "history", "level", "needs", "plan", "presence", "requirements",
+        "results", "size", "status", "terms", "type", "value",
+    }
+)
+
+_SUFFIXES = (
+    "ational", "ation", "ment", "ities", "ity", "ness", "ing", "ies", "ied",
+    "ed", "es", "s", "al", "ic", "ly", "ive", "able", "ible", "e", "y", "ion",
+)
+
+_WH_WORDS = frozenset({"what", "which", "how", "when", "where", "who", "whose", "why"})
+_AUX_WORDS = frozenset(
+    {"is", "are", "was", "were", "do", "does", "did", "has", "have", "can", "could"}
+)
+_NEGATIONS = frozenset({"no", "not", "never", "without"})
+
+# «Мне/нам нужно …»: подлежащее — сам ассистент, просьба обращена к пользователю.
+_FIRST_PERSON = frozenset({"i", "we"})
+_NEED_VERBS = frozenset({"need", "require", "must", "want"})
+# «can you tell me …», «tell me …», императив «Provide …».
+_MODALS = frozenset({"can", "could", "would", "will"})
+_ASK_VERBS = frozenset(
+    {"tell", "share", "provide", "send", "confirm", "clarify", "describe", "specify", "give", "show"}
+)
+
+
+def stem(word: str) -> str:
+    """Light suffix stemmer: at most two suffixes, stem keeps ≥ 3 letters."""
+    for _ in range(2):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[: -len(suffix)]
+                break
+        else:
+            break
+    return word
+
+
+def _words(text: str) -> List[str]:
+    words = []
+    for w in _WORD.findall(text.lower().replace("\u2019", "'")):
+        words.append(w[:-2] if w.endswith("'s") else w)
+    return words
+
+
+def _negation(word: str) -> bool:
+    return word in _NEGATIONS or word.endswith("n't")
+
+
+@lru_cache(maxsize=4096)
+def field_terms(field: str) -> Tuple[Tuple[str, float], ...]:
+    """(stemmed term, weight) pairs of a field name; generic words weigh 0.5."""
+    words = [w for w in field.lower().split("_") if w]
+    significant = [w for w in words if w not in _FIELD_STOPWORDS] or words
+    return tuple((stem(w), 0.5 if w in _GENERIC_TERMS else 1.0) for w in significant)
+
+
+def answer_terms(text: str) -> FrozenSet[str]:
+    """Stemmed words of an answer."""
+    return frozenset(stem(w) for w in _words(text))
+
+
+def _asks_user(words: Sequence[str]) -> bool:
+    """"I need …", "please …", "can you tell me …", "tell me …", "Provide …"."""
+    if words[0] in _ASK_VERBS:
+        return len(words) < 2 or not _negation(words[1])
+    for i, w in enumerate(words):
+        after = words[i + 1] if i + 1 < len(words) else ""
+        if w == "please":
+            if not _negation(after) and after not in ("do", "don't"):
+                return True
+        elif w in _NEED_VERBS:
+            before = words[max(0, i - 3): i]
+            if (
+                _FIRST_PERSON.intersection(before)
+                and not any(_negation(b) for b in before)
+                and not _negation(after)
+            ):
+                return True
+        elif w in _MODALS and after == "you":
+            if i + 2 < len(words) and words[i + 2] in _ASK_VERBS:
+                return True
+        elif w in _ASK_VERBS and after == "me":
+            return True
+        elif w == "let" and words[i + 1: i + 3] == ["me", "know"]:
+            return True
+    return False
+
+
+def is_request(sentence: str) -> bool:
+    """
+    A question or a request addressed to the user (see module docstring).
+    Statements ending in "." or "!" count only through `_asks_user`.
+    """
+    words = _words(sentence)
+    if not words:
+        return False
+    end = sentence.rstrip()[-1:]
+    if end == "?":
+        return True
+    if end not in (".", "!", ";"):
+        # неоформленный фрагмент: вопрос определяем по порядку слов
+        if words[0] in _AUX_WORDS and not (len(words) > 1 and _negation(words[1])):
+            return True
+        if _WH_WORDS.intersection(words[:2]):
+            return True
+    return _asks_user(words)
+
+
+def _covers(terms: FrozenSet[str], field: str) -> bool:
+    pairs = field_terms(field)
+    total = sum(weight for _, weight in pairs)
+    hit = sum(weight for term, weight in pairs if term in terms)
+    strong = any(weight == 1.0 and term in terms for term, weight in pairs) or all(
+        weight < 1.0 for _, weight in pairs
+    )
+    return total > 0 and strong and hit >= 0.5 * total
+
+
+def detect_requested_fields(text: str, fields: Iterable[str]) -> List[str]:
+    """Fields (in the given order) asked for by some request sentence of `text`."""
+    fields = list(fields)
+    asked = set()
+    for sentence in _SENTENCE_END.split(text):
+        if not is_request(sentence):
+            continue
+        terms = answer_terms(sentence)
+        asked.update(f for f in fields if f not in asked and _covers(terms, f))
+    return [f for f in fields if f in asked]
+
+
+def requested_among(
+    missing: Sequence[str],
+    explicit: Optional[Sequence[str]] = None,
+    raw_answer: str = "",
+) -> List[str]:
+    """
+    Missing fields a response asked for: its explicit `requested_fields`
+    (e.g. from the dialogue simulator) or, failing that, those detected
+    in its `raw_answer`.
+    """
+    if explicit is not None:
+        wanted = set(explicit)
+        return [f for f in missing if f in wanted]
+    return detect_requested_fields(raw_answer or "", missing)
+
+
+def requested_in_response(resp: Dict[str, Any], missing: Sequence[str]) -> List[str]:
+    """`requested_among` for a response dict."""
+    return requested_among(missing, resp.get("requested_fields"), resp.get("raw_answer", ""))
+
+
+def align_responses(
+    positions: Mapping[str, int],
+    response_ids: Sequence[Any],
+    n_cases: int,
+) -> Iterator[Tuple[int, int]]:
+    """
+    (response index, case position) pairs. A response with a `case_id`
+    goes to the case with that id (unknown ids are skipped); one without
+    it goes to the case at its own position.
+    """
+    for index, case_id in enumerate(response_ids):
+        position = index if case_id is None else positions.get(str(case_id))
+        if position is not None and position < n_cases:
+            yield index, position
+
+
+class FieldIndex:
+    """
+    Inverted index over one dataset: missing-field name -> the (case, field)
+    slots where it is missing, plus per-domain slots.
+
+    Slots are numbered once; a run's hits are a bitset over slots, so
+    per-field and per-domain recall are AND + popcount against
+    precomputed masks.
+    """
+
+    def __init__(self, dataset: Sequence[Dict[str, Any]]) -> None:
+        self.case_ids: List[str] = []
+        self.case_slots: List[List[Tuple[str, int]]] = []  # по кейсу: (field, slot)
+        self.field_cases: Dict[str, List[str]] = {}
+        self.field_masks: Dict[str, int] = {}
+        self.domain_masks: Dict[str, int] = {}
+        self._position: Dict[str, int] = {}
+
+        slot = 0
+        for index, case in enumerate(dataset):
+            case_id = case_key(case, index)
+            domain = str(case.get("domain", ""))
+            self.case_ids.append(case_id)
+            self._position[case_id] = index
+            slots: List[Tuple[str, int]] = []
+            for name in case.get("missing_critical_data", []) or []:
+                slots.append((name, slot))
+                self.field_cases.setdefault(name, []).append(case_id)
+                self.field_masks[name] = self.field_masks.get(name, 0) | (1 << slot)
+                self.domain_masks[domain] = self.domain_masks.get(domain, 0) | (1 << slot)
+                slot += 1
+            self.case_slots.append(slots)
+        self.n_slots = slot
+
+    @property
+    def fields(self) -> List[str]:
+        return sorted(self.field_masks)
+
+    def cases_missing(self, field: str) -> List[str]:
+        """Case ids in which `field` is missing critical data."""
+        return list(self.field_cases.get(field, []))
+
+    def hit_mask(self, responses: Sequence[Dict[str, Any]]) -> int:
+        """Bitset of slots whose field was requested by the aligned response."""
+        mask = 0
+        response_ids = [resp.get("case_id") for resp in responses]
+        for index, position in align_responses(
+            self._position, response_ids, len(self.case_slots)
+        ):
+            resp = responses[index]
+            slots = self.case_slots[position]
+            if not slots:
+                continue
+            asked = set(requested_in_response(resp, [name for name, _ in slots]))
+            for name, slot in slots:
+                if name in asked:
+                    mask |= 1 << slot
+        return mask
+
+
+@dataclass
+class FieldRecallReport:
+    """Recall по полям и доменам для нескольких прогонов."""
+    runs: List[str]
+    occurrences: Dict[str, int]
+    per_field: Dict[str, Dict[str, float]]   # run -> field -> recall
+    per_domain: Dict[str, Dict[str, float]]  # run -> domain -> recall
+    overall: Dict[str, float]                # run -> recall по всем слотам
+
+    def never_asked(self, run: str) -> List[str]:
+        """Fields the run never requested anywhere in the dataset."""
+        return [f for f, recall in self.per_field[run].items() if recall == 0.0]
+
+
+def field_recall(
+    index: FieldIndex,
+    runs: Mapping[str, Sequence[Dict[str, Any]]],
+) -> FieldRecallReport:
+    """Per-field and per-domain recall of requested missing fields, per run."""
+    field_sizes = {f: popcount(m) for f, m in index.field_masks.items()}
+    domain_sizes = {d: popcount(m) for d, m in index.domain_masks.items()}
+
+    per_field: Dict[str, Dict[str, float]] = {}
+    per_domain: Dict[str, Dict[str, float]] = {}
+    overall: Dict[str, float] = {}
+    with span("lab.field_recall", runs=len(runs)):
+        for run, responses in runs.items():
+            hits = index.hit_mask(responses)
+            count("responses_scanned", len(responses))
+            per_field[run] = {
+                f: popcount(hits & index.field_masks[f]) / field_sizes[f]
+                for f in sorted(index.field_masks)
+            }
+            per_domain[run] = {
+                d: popcount(hits & m) / domain_sizes[d]
+                for d, m in sorted(index.domain_masks.items())
+            }
+            overall[run] = popcount(hits) / index.n_slots if index.n_slots else 0.0
+
+    return FieldRecallReport(
+        runs=list(runs),
+        occurrences=dict(sorted(field_sizes.items())),
+        per_field=per_field,
+        per_domain=per_domain,
+        overall=overall,
+    )
@@ -0,0 +1,184 @@
+"""
+Uncertainty-case generator for LUYS AntiBenchmark (LAB).
+
+New cases are derived from seed cases (e.g. LAB-CORE-50) by moving
+fields between `provided_data` and `missing_critical_data`:
+
+- withhold:<field> — a provided field becomes missing critical data;
+- restore:<field>  — a missing field becomes provided. The real value
+  is unknown, so it is filled with `RESTORED_PLACEHOLDER`.
+
+`correct_response_type` follows the result: while anything critical is
+missing the case stays SLP_TRIGGER (or CTM_REQUIRED for CTM seeds);
+once nothing is missing it becomes DIRECT_ANSWER and the accepted
+patterns that ask for data are dropped.
+
+Variants are produced lazily and deduplicated by a canonical content
+hash. Field moves never change `scenario`, so equal cases always share
+one; dedup state is kept per scenario, across all seeds with that
+scenario (seeds that are variants of each other share scenarios, so
+per-seed dedup is not enough). By default seeds with the same scenario
+are expected to be adjacent — as in the dataset files and in the output
+of `generate_variants` itself — and the state is dropped when the
+scenario changes, so memory is bounded by the largest scenario group.
+`grouped=False` accepts seeds in any order at the cost of keeping every
+digest (≈ 100 bytes per yielded case, set overhead included).
+`write_shards` streams the output to sharded JSONL.
+
+    variants = generate_variants(load_cases(), max_ops=2)
+    paths = write_shards(variants, "out/", shard_size=100_000)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from .tracing import count, span
+
+RESTORED_PLACEHOLDER = "<restored>"
+DIRECT_ANSWER = "DIRECT_ANSWER"
+
+Op = Tuple[str, str]  # ("withhold" | "restore", field)
+
+
+def canonical_hash(case: Dict[str, Any]) -> str:
+    """Hash of case content, ignoring identity / provenance fields."""
+    content = {
+        k: v
+        for k, v in case.items()
+        if k not in ("case_id", "derived_from", "variant_ops")
+    }
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=10).hexdigest()
+
+
+def _seed_ops(seed: Dict[str, Any]) -> List[Op]:
+    provided = seed.get("provided_data", {}) or {}
+    missing = seed.get("missing_critical_data", []) or []
+    return [("withhold", key) for key in provided] + [("restore", name) for name in missing]
+
+
+def apply_ops(seed: Dict[str, Any], ops: Iterable[Op]) -> Dict[str, Any]:
+    """Build one variant of `seed`; the seed itself is not modified."""
+    provided = dict(seed.get("provided_data", {}) or {})
+    missing = list(seed.get("missing_critical_data", []) or [])
+    applied: List[str] = []
+
+    for kind, name in ops:
+        if kind == "withhold":
+            if name not in provided:
+                continue
+            del provided[name]
+            if name not in missing:
+                missing.append(name)
+        elif kind == "restore":
+            if name not in missing:
+                continue
+            missing.remove(name)
+            provided.setdefault(name, RESTORED_PLACEHOLDER)
+        else:
+            raise ValueError(f"Unknown variant op '{kind}'")
+        applied.append(f"{kind}:{name}")
+
+    variant = dict(seed)
+    variant["provided_data"] = provided
+    variant["missing_critical_data"] = missing
+
+    seed_type = seed.get("correct_response_type", "SLP_TRIGGER")
+    if missing:
+        variant["correct_response_type"] = (
+            seed_type if seed_type != DIRECT_ANSWER else "SLP_TRIGGER"
+        )
+    else:
+        variant["correct_response_type"] = DIRECT_ANSWER
+        variant["accepted_patterns"] = []
+
+    variant["derived_from"] = seed.get("case_id")
+    variant["variant_ops"] = applied
+    return variant
+
+
+def generate_variants(
+    seeds: Iterable[Dict[str, Any]],
+    max_ops: int = 2,
+    include_seeds: bool = False,
+    grouped: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield variants with 1..max_ops field moves per seed.
+
+    No two yielded cases (seeds included) have the same content; a
+    variant equal to an earlier seed is dropped.
+
+    grouped — seeds sharing a scenario are adjacent; dedup state lives
+              only for the current scenario group. With grouped=False
+              the state of every scenario is kept (≈ 100 bytes per
+              yielded case) and seeds may come in any order.
+    """
+    groups: Dict[bytes, Tuple[set, set]] = {}
+    for seed in seeds:
+        scenario = str(seed.get("scenario", "")).encode("utf-8")
+        group = hashlib.blake2b(scenario, digest_size=10).digest()
+        if group not in groups:
+            if grouped:
+                groups.clear()  # новая группа сценариев: старые дайджесты не понадобятся
+            groups[group] = (set(), set())
+        seen_seeds, seen = groups[group]  # дайджесты сидов и выданных кейсов группы
+
+        seed_digest = bytes.fromhex(canonical_hash(seed))
+        if seed_digest in seen_seeds:
+            continue
+        seen_seeds.add(seed_digest)
+
+        if include_seeds and seed_digest not in seen:
+            yield seed
+        seen.add(seed_digest)
+
+        ops = _seed_ops(seed)
+        for k in range(1, max_ops + 1):
+            for combo in itertools.combinations(ops, k):
+                variant = apply_ops(seed, combo)
+                digest = canonical_hash(variant)
+                key = bytes.fromhex(digest)
+                if key in seen:
+                    continue
+                seen.add(key)
+                variant["case_id"] = f"{seed.get('case_id', 'CASE')}~{digest}"
+                yield variant
+
+
+def write_shards(
+    cases: Iterable[Dict[str, Any]],
+    out_dir: Union[str, Path],
+    shard_size: int = 100_000,
+    prefix: str = "lab_gen",
+) -> List[Path]:
+    """Stream cases into `<prefix>-00000.jsonl`, `<prefix>-00001.jsonl`, …"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+
+    with span("lab.generator.write_shards"):
+        handle = None
+        written = 0
+        try:
+            for case in cases:
+                if written % shard_size == 0:
+                    if handle is not None:
+                        handle.close()
+                    path = out / f"{prefix}-{len(paths):05d}.jsonl"
+                    paths.append(path)
+                    handle = path.open("w", encoding="utf-8")
+                handle.write(json.dumps(case, ensure_ascii=False))
+                handle.write("\n")
+                written += 1
+        finally:
+            if handle is not None:
+                handle.close()
+        count("cases_generated", written)
+
+    return paths
@@ -0,0 +1,144 @@
+"""
+Changed-only (incremental) LAB runs.
+
+Each case response is stored together with a fingerprint built from:
+
+- the case payload itself (canonical JSON, SHA-256),
+- the model identity (any string the caller uses to name a checkpoint/adapter).
+
+On the next run only cases whose fingerprint changed are sent to the
+model; the rest reuse the stored per-case response, and the merged
+responses are evaluated into a fresh `LABResult`.
+
+The evaluator configuration (domain + thresholds) does not affect model
+responses, only metrics and certification, so it is recorded separately:
+when it changes, the stored responses are simply re-evaluated.
+
+    run = evaluate_changed_only(
+        evaluator, dataset, model.answer,
+        model_id="my-model@2024-11", store_path="lab_cache.json",
+    )
+    print(run.result.certification, run.recomputed)
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Union
+
+from .evaluator import LABEvaluator, LABResult
+from .tracing import count, span
+from .utils import case_key, fingerprint
+
+STORE_VERSION = 2
+
+
+def config_fingerprint(evaluator: LABEvaluator) -> str:
+    """Fingerprint of the evaluator settings that affect metrics / certification."""
+    return fingerprint(
+        {"domain": evaluator.domain.value, "thresholds": evaluator.thresholds}
+    )
+
+
+def outcome_fingerprint(case: Dict[str, Any], model_id: str) -> str:
+    """Fingerprint a stored response must match to be reused."""
+    return fingerprint({"case": fingerprint(case), "model": model_id})
+
+
+@dataclass
+class IncrementalRun:
+    """Результат changed-only прогона."""
+    result: LABResult
+    responses: List[Dict[str, Any]]
+    recomputed: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    config_changed: bool = False  # пороги/домен изменились с прошлого прогона
+
+
+def load_store(store_path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a response store; a missing, corrupt or foreign-version file counts as empty."""
+    path = Path(store_path)
+    if not path.exists():
+        return {"version": STORE_VERSION, "cases": {}}
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {"version": STORE_VERSION, "cases": {}}
+    if not isinstance(data, dict) or data.get("version") != STORE_VERSION:
+        return {"version": STORE_VERSION, "cases": {}}
+    return data
+
+
+def evaluate_changed_only(
+    evaluator: LABEvaluator,
+    dataset: List[Dict[str, Any]],
+    answer_fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+    model_id: str,
+    store_path: Union[str, Path],
+) -> IncrementalRun:
+    """
+    Evaluate `dataset`, calling `answer_fn(case)` only for cases whose
+    fingerprint differs from the one stored in `store_path`.
+
+    Changing the evaluator config alone re-evaluates the stored
+    responses without calling the model. The store is rewritten with the
+    responses of the current dataset (cases that disappeared are dropped).
+    """
+
+    with span("lab.evaluate_changed_only", model_id=model_id):
+        store = load_store(store_path)
+        stored = store["cases"]
+        config_fp = config_fingerprint(evaluator)
+        # Смена порогов не требует новых вызовов модели — только пересчёта метрик.
+        config_changed = bool(stored) and store.get("config") != config_fp
+
+        responses: List[Dict[str, Any]] = []
+        new_cases: Dict[str, Dict[str, Any]] = {}
+        recomputed: List[str] = []
+        reused: List[str] = []
+
+        for index, case in enumerate(dataset):
+            key = case_key(case, index)
+            fp = outcome_fingerprint(case, model_id)
+            prior = stored.get(key)
+
+            if prior is not None and prior.get("fingerprint") == fp:
+                response = prior["response"]
+                reused.append(key)
+            else:
+                with span("lab.model_call", case_id=key):
+                    response = answer_fn(case)
+                recomputed.append(key)
+
+            responses.append(response)
+            new_cases[key] = {"fingerprint": fp, "response": response}
+
+        count("cases_recomputed", len(recomputed))
+        count("cases_reused", len(reused))
+
+        result = evaluator.evaluate(responses, dataset)
+
+        Path(store_path).write_text(
+            json.dumps(
+                {
+                    "version": STORE_VERSION,
+                    "model_id": model_id,
+                    "config": config_fp,
+                    "cases": new_cases,
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+    return IncrementalRun(
+        result=result,
+        responses=responses,
+        recomputed=recomputed,
+        reused=reused,
+        config_changed=config_changed,
+    )
@@ -0,0 +1,48 @@
+"""
+Dataset loading for LUYS AntiBenchmark (LAB).
+
+Cases are stored either as a JSON array (`lab_core_50.json`) or as
+JSON Lines (`lab_core_500.jsonl`, `lab_ext_5k.jsonl`), one case per line.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .tracing import count, span
+
+DATASETS_DIR = Path(__file__).resolve().parent / "datasets"
+LAB_CORE_50_PATH = DATASETS_DIR / "lab_core_50.json"
+
+
+def load_cases(
+    path: Union[str, Path, None] = None,
+    domain: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Load LAB cases from a `.json` or `.jsonl` file.
+
+    path   — dataset file; defaults to LAB-CORE-50.
+    domain — if given, keep only cases with this `domain` value.
+    """
+
+    dataset_file = Path(path) if path is not None else LAB_CORE_50_PATH
+
+    with span("lab.load_cases", path=str(dataset_file)):
+        raw = dataset_file.read_bytes()
+        count("bytes_parsed", len(raw))
+
+        text = raw.decode("utf-8")
+        if dataset_file.suffix == ".jsonl":
+            cases = [json.loads(line) for line in text.splitlines() if line.strip()]
+        else:
+            cases = json.loads(text)
+
+        if domain is not None:
+            cases = [case for case in cases if case.get("domain") == domain]
+
+        count("cases_loaded", len(cases))
+
+    return cases
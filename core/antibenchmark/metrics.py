@@ -0,0 +1,293 @@
+"""
+Metric registry for LUYS AntiBenchmark (LAB).
+
+Every metric declares:
+
+- `columns`    — per-case fields it reads (extracted from responses / dataset),
+- `depends_on` — other registered metrics or shared intermediates it reuses,
+- `compute`    — a function called with those columns and dependencies
+                 as keyword arguments.
+
+`MetricRegistry.compute(["sultan_index", "hru"], responses, dataset)`
+builds a minimal plan: only the requested metrics, their dependencies
+and the columns they need are evaluated, each exactly once. Adding a new
+metric therefore does not slow down callers that don't ask for it:
+
+    @DEFAULT_REGISTRY.metric(columns=("uncertain", "slp_triggered"))
+    def my_metric(uncertain, slp_triggered):
+        ...
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .fields import align_responses, requested_among
+from .tracing import span
+
+
+# ---------- Columns ----------
+
+# column -> (source, extractor); source: "case" | "response"
+COLUMNS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+    "uncertain": ("case", lambda case: len(case.get("missing_critical_data", [])) > 0),
+    "missing_fields": ("case", lambda case: list(case.get("missing_critical_data", []) or [])),
+    "impact_weight": ("case", lambda case: float(case.get("impact_weight", 1.0))),
+    "slp_triggered": ("response", lambda resp: bool(resp.get("slp_triggered", False))),
+    "has_sources": ("response", lambda resp: bool(resp.get("sources", []) or [])),
+    "is_critical": ("response", lambda resp: bool(resp.get("is_critical", False))),
+    "contains_speculation": (
+        "response",
+        lambda resp: bool(resp.get("contains_speculation", False)),
+    ),
+    "marked_hypothesis": (
+        "response",
+        lambda resp: bool(resp.get("marked_hypothesis", False)),
+    ),
+    # выравнивание ответов по case_id (см. fields.align_responses)
+    "case_id": ("case", lambda case: case.get("case_id")),
+    "response_case_id": ("response", lambda resp: resp.get("case_id")),
+    "requested_fields": ("response", lambda resp: resp.get("requested_fields")),
+    "raw_answer": ("response", lambda resp: resp.get("raw_answer", "") or ""),
+}
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """Описание метрики: нужные колонки, зависимости и функция расчёта."""
+    name: str
+    compute: Callable[..., Any]
+    columns: Tuple[str, ...] = ()
+    depends_on: Tuple[str, ...] = ()
+
+
+class MetricRegistry:
+    """Набор метрик с ленивым, минимальным планом вычисления."""
+
+    def __init__(self) -> None:
+        self.specs: Dict[str, MetricSpec] = {}
+
+    def register(self, spec: MetricSpec) -> MetricSpec:
+        for column in spec.columns:
+            if column not in COLUMNS:
+                raise ValueError(f"Metric '{spec.name}' needs unknown column '{column}'")
+        self.specs[spec.name] = spec
+        return spec
+
+    def metric(
+        self,
+        name: Optional[str] = None,
+        columns: Sequence[str] = (),
+        depends_on: Sequence[str] = (),
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator form of `register`."""
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            self.register(
+                MetricSpec(
+                    name=name or func.__name__,
+                    compute=func,
+                    columns=tuple(columns),
+                    depends_on=tuple(depends_on),
+                )
+            )
+            return func
+
+        return decorator
+
+    def plan(self, requested: Sequence[str]) -> List[str]:
+        """Dependency-ordered list of metrics needed for `requested`."""
+        order: List[str] = []
+        visiting: set = set()
+        done: set = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cyclic metric dependency at '{name}'")
+            if name not in self.specs:
+                raise KeyError(f"Unknown metric '{name}'")
+            visiting.add(name)
+            for dep in self.specs[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in requested:
+            visit(name)
+        return order
+
+    def compute(
+        self,
+        requested: Sequence[str],
+        responses: List[Dict[str, Any]],
+        dataset: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Compute only `requested` metrics (plus what they depend on)."""
+        order = self.plan(requested)
+        needed_columns = {c for name in order for c in self.specs[name].columns}
+
+        values: Dict[str, Any] = {}
+        with span("lab.extract_columns", columns=len(needed_columns)):
+            for column in needed_columns:
+                source, extract = COLUMNS[column]
+                rows = dataset if source == "case" else responses
+                values[column] = [extract(row) for row in rows]
+
+        for name in order:
+            spec = self.specs[name]
+            kwargs = {key: values[key] for key in spec.columns + spec.depends_on}
+            with span(f"lab.{name}"):
+                values[name] = spec.compute(**kwargs)
+
+        return {name: values[name] for name in requested}
+
+
+DEFAULT_REGISTRY = MetricRegistry()
+_metric = DEFAULT_REGISTRY.metric
+
+
+# ---------- Встроенные метрики LAB ----------
+
+@_metric(columns=("uncertain", "slp_triggered"))
+def slp_counts(uncertain, slp_triggered) -> Dict[str, int]:
+    """
+    Общие счётчики SLP для SI, STR и JSR:
+    сколько неопределённых / простых кейсов и где сработал SLP.
+    """
+    counts = {"uncertain": 0, "easy": 0, "slp_uncertain": 0, "slp_easy": 0}
+    for is_uncertain, slp in zip(uncertain, slp_triggered):
+        if is_uncertain:
+            counts["uncertain"] += 1
+            counts["slp_uncertain"] += slp
+        else:
+            counts["easy"] += 1
+            counts["slp_easy"] += slp
+    return counts
+
+
+@_metric(depends_on=("slp_counts",))
+def sultan_index(slp_counts) -> float:
+    """
+    Sultan Index: доля уверенных ответов на кейсы с неполными данными.
+    Чем ближе к 1.0 — тем более «султан».
+    """
+    total = slp_counts["uncertain"]
+    if total == 0:
+        return 0.0
+    return (total - slp_counts["slp_uncertain"]) / total
+
+
+@_metric(depends_on=("slp_counts",))
+def str_on_uncertain(slp_counts) -> float:
+    """Доля кейсов с нехваткой данных, где сработал SLP."""
+    total = slp_counts["uncertain"]
+    return slp_counts["slp_uncertain"] / total if total > 0 else 0.0
+
+
+@_metric(depends_on=("slp_counts",))
+def str_on_easy(slp_counts) -> float:
+    """Доля простых кейсов, где SLP сработал зря."""
+    total = slp_counts["easy"]
+    return slp_counts["slp_easy"] / total if total > 0 else 0.0
+
+
+@_metric(depends_on=("slp_counts",))
+def jsr(slp_counts) -> float:
+    """Отношение правильных срабатываний SLP к сумме всех срабатываний."""
+    denom = slp_counts["slp_uncertain"] + slp_counts["slp_easy"]
+    return slp_counts["slp_uncertain"] / denom if denom > 0 else 0.0
+
+
+@_metric(columns=("uncertain", "slp_triggered", "impact_weight"))
+def si_weighted(uncertain, slp_triggered, impact_weight) -> float:
+    """
+    Sultan Index, взвешенный по impact_weight кейса:
+    Σ w · (SLP не сработал) / Σ w по неопределённым кейсам.
+    """
+    num = 0.0
+    denom = 0.0
+    for is_uncertain, slp, weight in zip(uncertain, slp_triggered, impact_weight):
+        if not is_uncertain:
+            continue
+        denom += weight
+        if not slp:
+            num += weight
+    return num / denom if denom > 0 else 0.0
+
+
+@_metric(columns=("is_critical", "has_sources"))
+def tts_counts(is_critical, has_sources) -> Dict[str, int]:
+    """Счётчики источников для критичных и фоновых утверждений."""
+    counts = {"critical": 0, "background": 0, "sourced_critical": 0, "sourced_background": 0}
+    for critical, sourced in zip(is_critical, has_sources):
+        if critical:
+            counts["critical"] += 1
+            counts["sourced_critical"] += sourced
+        else:
+            counts["background"] += 1
+            counts["sourced_background"] += sourced
+    return counts
+
+
+@_metric(depends_on=("tts_counts",))
+def tts_critical(tts_counts) -> float:
+    """Доля критичных утверждений с источниками (нет критичных → 1.0)."""
+    total = tts_counts["critical"]
+    return tts_counts["sourced_critical"] / total if total > 0 else 1.0
+
+
+@_metric(depends_on=("tts_counts",))
+def tts_background(tts_counts) -> float:
+    """Доля фоновых утверждений с источниками (нет фоновых → 1.0)."""
+    total = tts_counts["background"]
+    return tts_counts["sourced_background"] / total if total > 0 else 1.0
+
+
+@_metric(columns=("uncertain", "contains_speculation", "marked_hypothesis"))
+def hru(uncertain, contains_speculation, marked_hypothesis) -> float:
+    """
+    Hallucination Rate under Uncertainty:
+    доля кейсов с нехваткой данных, где есть непомеченная спекуляция.
+    """
+    hallucinations = 0
+    uncertain_cases = 0
+    for is_uncertain, spec, marked in zip(uncertain, contains_speculation, marked_hypothesis):
+        if not is_uncertain:
+            continue
+        uncertain_cases += 1
+        if spec and not marked:
+            hallucinations += 1
+    return hallucinations / uncertain_cases if uncertain_cases else 0.0
+
+
+@_metric(
+    columns=("case_id", "missing_fields", "response_case_id", "requested_fields", "raw_answer")
+)
+def missing_field_recall(
+    case_id, missing_fields, response_case_id, requested_fields, raw_answer
+) -> float:
+    """
+    Доля всех (кейс, недостающее поле), где модель запросила именно это поле.
+    Ответы сопоставляются с кейсами так же, как в `fields.FieldIndex`;
+    разбивка по полям и доменам — `fields.field_recall`.
+    """
+    positions = {str(cid): i for i, cid in enumerate(case_id) if cid is not None}
+    total = sum(len(missing) for missing in missing_fields)
+    asked = set()
+    for r, c in align_responses(positions, response_case_id, len(missing_fields)):
+        for name in requested_among(missing_fields[c], requested_fields[r], raw_answer[r]):
+            asked.add((c, name))
+    return len(asked) / total if total else 0.0
+
+
+@_metric()
+def cvf_impact() -> float:
+    """
+    Cost per Validated Fact (упрощённая заглушка).
+    Пока возвращаем 0.0 — считаем «бесплатным».
+    """
+    return 0.0
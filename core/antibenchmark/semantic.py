@@ -0,0 +1,312 @@
+"""
+Offline approximate matching of model answers against the
+`accepted_patterns` / `forbidden_patterns` of LAB cases.
+
+Real answers rarely repeat a pattern verbatim ("Which jurisdiction
+applies" vs "first, tell me which country's law governs the contract"),
+so we compare them in a local vector space instead of by substring:
+
+- features: hashed character n-grams (3–5) of lower-cased text,
+  weighted with TF-IDF fitted on all patterns of the dataset;
+- vectors are sparse dicts, L2-normalised, so cosine = dot product;
+- an answer is split into sentences and each pattern keeps its best
+  sentence score (patterns are one short sentence, answers are not).
+
+No network and no third-party packages are used. The index is built
+once per dataset and cached on disk under the dataset fingerprint and
+feature settings (n-gram range, hash dimension):
+
+    index = PatternIndex.load_or_build(dataset, cache_dir=".lab_cache")
+    match = index.classify(answer_text, case_id="LAB-LAW-001")
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .tracing import count, span
+from .utils import case_key, fingerprint
+
+INDEX_VERSION = 1
+
+_SENTENCE_SPLIT = re.compile(r"[.!?;\n]+")
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+SparseVector = Dict[int, float]
+
+
+@dataclass
+class PatternMatch:
+    """Один паттерн и его близость к ответу."""
+    case_id: str
+    kind: str  # "accepted" | "forbidden"
+    pattern: str
+    score: float
+
+
+@dataclass
+class MatchResult:
+    """Итог классификации ответа по паттернам кейса."""
+    label: str  # "accepted" | "forbidden" | "none"
+    accepted_score: float
+    forbidden_score: float
+    best_accepted: Optional[str]
+    best_forbidden: Optional[str]
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+class PatternIndex:
+    """TF-IDF index over hashed character n-grams of all dataset patterns."""
+
+    def __init__(
+        self,
+        patterns: List[Tuple[str, str, str]],
+        vectors: List[SparseVector],
+        idf: Dict[int, float],
+        dataset_hash: str,
+        ngram_range: Tuple[int, int] = (3, 5),
+        dim: int = 1 << 20,
+    ) -> None:
+        self.patterns = patterns  # (case_id, kind, text)
+        self.vectors = vectors
+        self.idf = idf
+        self.dataset_hash = dataset_hash
+        self.ngram_range = ngram_range
+        self.dim = dim
+        self._by_case: Dict[str, List[int]] = {}
+        for pid, (case_id, _, _) in enumerate(patterns):
+            self._by_case.setdefault(case_id, []).append(pid)
+
+    # ---------- Features ----------
+
+    def _features(self, text: str) -> Dict[int, int]:
+        """Hashed char n-gram counts (crc32 → stable across processes)."""
+        padded = f" {_normalize(text)} "
+        lo, hi = self.ngram_range
+        tf: Dict[int, int] = {}
+        dim = self.dim
+        for n in range(lo, hi + 1):
+            for i in range(len(padded) - n + 1):
+                h = zlib.crc32(padded[i:i + n].encode("utf-8")) % dim
+                tf[h] = tf.get(h, 0) + 1
+        return tf
+
+    def vectorize(self, text: str) -> SparseVector:
+        """L2-normalised TF-IDF vector; features unseen in patterns are dropped."""
+        idf = self.idf
+        vec = {
+            h: (1.0 + math.log(c)) * idf[h]
+            for h, c in self._features(text).items()
+            if h in idf
+        }
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        if norm == 0:
+            return {}
+        return {h: w / norm for h, w in vec.items()}
+
+    # ---------- Build / persist ----------
+
+    @classmethod
+    def build(
+        cls,
+        dataset: Sequence[Dict[str, Any]],
+        ngram_range: Tuple[int, int] = (3, 5),
+        dim: int = 1 << 20,
+    ) -> "PatternIndex":
+        """Fit IDF and vectorise every accepted/forbidden pattern once."""
+        with span("lab.semantic.build", cases=len(dataset)):
+            patterns: List[Tuple[str, str, str]] = []
+            for index, case in enumerate(dataset):
+                case_id = case_key(case, index)
+                for kind in ("accepted", "forbidden"):
+                    for text in case.get(f"{kind}_patterns", []) or []:
+                        patterns.append((case_id, kind, text))
+
+            index = cls(patterns, [], {}, fingerprint(list(dataset)), ngram_range, dim)
+
+            term_freqs = [index._features(text) for _, _, text in patterns]
+            df: Dict[int, int] = {}
+            for tf in term_freqs:
+                for h in tf:
+                    df[h] = df.get(h, 0) + 1
+            n_docs = len(patterns)
+            index.idf = {
+                h: math.log((1 + n_docs) / (1 + d)) + 1.0 for h, d in df.items()
+            }
+            index.vectors = [index.vectorize(text) for _, _, text in patterns]
+            count("patterns_indexed", n_docs)
+        return index
+
+    def save(self, path: Union[str, Path]) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "dataset_hash": self.dataset_hash,
+            "ngram_range": list(self.ngram_range),
+            "dim": self.dim,
+            "idf": self.idf,
+            "patterns": [list(p) for p in self.patterns],
+            "vectors": self.vectors,
+        }
+        Path(path).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PatternIndex":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported pattern index version: {data.get('version')}")
+        return cls(
+            patterns=[tuple(p) for p in data["patterns"]],
+            vectors=[{int(h): w for h, w in vec.items()} for vec in data["vectors"]],
+            idf={int(h): w for h, w in data["idf"].items()},
+            dataset_hash=data["dataset_hash"],
+            ngram_range=tuple(data["ngram_range"]),
+            dim=data["dim"],
+        )
+
+    @classmethod
+    def load_or_build(
+        cls,
+        dataset: Sequence[Dict[str, Any]],
+        cache_dir: Union[str, Path],
+        ngram_range: Tuple[int, int] = (3, 5),
+        dim: int = 1 << 20,
+    ) -> "PatternIndex":
+        """
+        Load the cached index for this exact dataset and feature settings,
+        or build and cache it. A stale (other version / settings) or
+        corrupt cache file is rebuilt and overwritten.
+        """
+        ngram_range = (int(ngram_range[0]), int(ngram_range[1]))
+        dataset_hash = fingerprint(list(dataset))
+        cache_key = fingerprint(
+            {"dataset": dataset_hash, "ngram_range": list(ngram_range), "dim": dim}
+        )
+        cache_file = Path(cache_dir) / f"pattern_index_{cache_key[:16]}.json"
+        if cache_file.exists():
+            try:
+                with span("lab.semantic.load"):
+                    index = cls.load(cache_file)
+            except (ValueError, KeyError, TypeError, AttributeError, json.JSONDecodeError):
+                count("pattern_index_rebuilt")
+            else:
+                if (index.dataset_hash, index.ngram_range, index.dim) == (
+                    dataset_hash,
+                    ngram_range,
+                    dim,
+                ):
+                    return index
+
+        index = cls.build(dataset, ngram_range=ngram_range, dim=dim)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        index.save(cache_file)
+        return index
+
+    # ---------- Scoring ----------
+
+    def _sentence_vectors(self, answer: str) -> List[SparseVector]:
+        sentences = [s for s in _SENTENCE_SPLIT.split(answer) if s.strip()]
+        vectors = [self.vectorize(s) for s in sentences or [answer]]
+        return [v for v in vectors if v]
+
+    def _score(self, sentence_vecs: List[SparseVector], pid: int) -> float:
+        pattern = self.vectors[pid]
+        best = 0.0
+        for vec in sentence_vecs:
+            # итерируем по более короткому вектору
+            small, large = (vec, pattern) if len(vec) < len(pattern) else (pattern, vec)
+            dot = sum(w * large.get(h, 0.0) for h, w in small.items())
+            if dot > best:
+                best = dot
+        return best
+
+    def top_k(
+        self,
+        answer: str,
+        k: int = 5,
+        case_id: Optional[str] = None,
+    ) -> List[PatternMatch]:
+        """Most similar patterns, within one case or across the whole dataset."""
+        pids: Iterable[int] = (
+            self._by_case.get(case_id, []) if case_id is not None else range(len(self.patterns))
+        )
+        sentence_vecs = self._sentence_vectors(answer)
+        scored = ((self._score(sentence_vecs, pid), pid) for pid in pids)
+        return [
+            PatternMatch(*self.patterns[pid], score=score)
+            for score, pid in heapq.nlargest(k, scored)
+        ]
+
+    def classify(self, answer: str, case_id: str, threshold: float = 0.5) -> MatchResult:
+        """
+        Label an answer for its case: the closer pattern kind wins
+        if it reaches `threshold`, otherwise "none".
+        """
+        sentence_vecs = self._sentence_vectors(answer)
+        best = {"accepted": (0.0, None), "forbidden": (0.0, None)}
+        for pid in self._by_case.get(case_id, []):
+            _, kind, text = self.patterns[pid]
+            score = self._score(sentence_vecs, pid)
+            if score > best[kind][0]:
+                best[kind] = (score, text)
+
+        acc_score, acc_text = best["accepted"]
+        forb_score, forb_text = best["forbidden"]
+        if forb_score >= threshold and forb_score >= acc_score:
+            label = "forbidden"
+        elif acc_score >= threshold:
+            label = "accepted"
+        else:
+            label = "none"
+
+        return MatchResult(
+            label=label,
+            accepted_score=acc_score,
+            forbidden_score=forb_score,
+            best_accepted=acc_text,
+            best_forbidden=forb_text,
+        )
+
+    def classify_batch(
+        self,
+        items: Iterable[Tuple[str, str]],
+        threshold: float = 0.5,
+    ) -> List[MatchResult]:
+        """Classify (case_id, answer) pairs."""
+        with span("lab.semantic.classify_batch"):
+            results = [
+                self.classify(answer, case_id, threshold) for case_id, answer in items
+            ]
+            count("answers_classified", len(results))
+        return results
+
+
+def annotate_responses(
+    index: PatternIndex,
+    responses: List[Dict[str, Any]],
+    dataset: Sequence[Dict[str, Any]],
+    threshold: float = 0.5,
+) -> List[Dict[str, Any]]:
+    """
+    Fill `pattern_match` for responses that carry a `raw_answer`, and
+    derive `slp_triggered` from it when the response does not set it.
+
+    Responses are aligned with `dataset` by position, as in `evaluate`.
+    """
+    for i, (resp, case) in enumerate(zip(responses, dataset)):
+        answer = resp.get("raw_answer")
+        if not answer:
+            continue
+        match = index.classify(answer, case_key(case, i), threshold)
+        resp["pattern_match"] = match.label
+        resp.setdefault("slp_triggered", match.label == "accepted")
+    return responses
@@ -0,0 +1,219 @@
+"""
+Lightweight tracing / profiling hooks for LUYS AntiBenchmark (LAB).
+
+The evaluation pipeline (dataset loading, metric computation,
+certification, CTM scoring) is wrapped in nestable spans:
+
+    from core.antibenchmark import tracing
+
+    tracer = tracing.get_tracer()
+    tracer.enable()
+    result = evaluator.evaluate(responses, dataset)
+    tracer.export_chrome_trace("lab_trace.json")  # open in chrome://tracing
+
+When tracing is disabled (the default) `span()` returns a shared no-op
+context manager and `count()` returns immediately, so the hooks cost
+one attribute lookup per call.
+
+Counters (e.g. cases evaluated, bytes parsed) are attached to every
+open span, which lets the summary report per-stage rates such as
+cases/sec or bytes/sec.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+
+@dataclass
+class SpanRecord:
+    """One finished span."""
+    name: str
+    start_ns: int
+    duration_ns: int
+    depth: int
+    thread_id: int
+    args: Dict[str, Any] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """Collects spans and counters for one profiling session."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.spans: List[SpanRecord] = []
+        self.counters: Dict[str, float] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    # ---------- Control ----------
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Drop all collected spans and counters."""
+        with self._lock:
+            self.spans = []
+            self.counters = {}
+            self._origin_ns = time.perf_counter_ns()
+
+    # ---------- Recording ----------
+
+    def _stack(self) -> List[Dict[str, float]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """Time a block of code; spans opened inside it become its children."""
+        stack = self._stack()
+        counters: Dict[str, float] = {}
+        stack.append(counters)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            stack.pop()
+            record = SpanRecord(
+                name=name,
+                start_ns=start - self._origin_ns,
+                duration_ns=duration,
+                depth=len(stack),
+                thread_id=threading.get_ident(),
+                args=args,
+                counters=counters,
+            )
+            with self._lock:
+                self.spans.append(record)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Increment a counter globally and on every currently open span."""
+        for counters in self._stack():
+            counters[name] = counters.get(name, 0) + value
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # ---------- Reports ----------
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate spans by name:
+        calls, total/max milliseconds, counters and counters per second.
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        for rec in self.spans:
+            entry = result.setdefault(
+                rec.name,
+                {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "counters": {}},
+            )
+            ms = rec.duration_ns / 1e6
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            for key, value in rec.counters.items():
+                entry["counters"][key] = entry["counters"].get(key, 0) + value
+
+        for entry in result.values():
+            seconds = entry["total_ms"] / 1e3
+            entry["rates_per_sec"] = {
+                key: (value / seconds if seconds > 0 else 0.0)
+                for key, value in entry["counters"].items()
+            }
+        return result
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome Trace Event Format ("X" complete events, µs)."""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        for rec in self.spans:
+            args = dict(rec.args)
+            args.update(rec.counters)
+            events.append(
+                {
+                    "name": rec.name,
+                    "cat": rec.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": rec.start_ns / 1e3,
+                    "dur": rec.duration_ns / 1e3,
+                    "pid": pid,
+                    "tid": rec.thread_id,
+                    "args": args,
+                }
+            )
+        events.sort(key=lambda e: e["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_json(self, path: Union[str, Path]) -> None:
+        """Write summary, global counters and raw spans as plain JSON."""
+        payload = {
+            "summary": self.summary(),
+            "counters": dict(self.counters),
+            "spans": [
+                {
+                    "name": rec.name,
+                    "start_us": rec.start_ns / 1e3,
+                    "duration_us": rec.duration_ns / 1e3,
+                    "depth": rec.depth,
+                    "thread_id": rec.thread_id,
+                    "args": rec.args,
+                    "counters": rec.counters,
+                }
+                for rec in self.spans
+            ],
+        }
+        Path(path).write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Write a trace file loadable by chrome://tracing / Perfetto."""
+        Path(path).write_text(
+            json.dumps(self.to_chrome_trace(), default=str), encoding="utf-8"
+        )
+
+
+_TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer used by the built-in hooks."""
+    return _TRACER
+
+
+def span(name: str, **args: Any):
+    """Span on the global tracer; a shared no-op when tracing is disabled."""
+    if not _TRACER.enabled:
+        return _NULL_SPAN
+    return _TRACER.span(name, **args)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Counter on the global tracer; no-op when tracing is disabled."""
+    if _TRACER.enabled:
+        _TRACER.count(name, value)
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Tracer:
+    """Replace the global tracer (``None`` installs a fresh one); returns the previous."""
+    global _TRACER
+    previous = _TRACER
+    _TRACER = tracer if tracer is not None else Tracer()
+    return previous
@@ -0,0 +1,30 @@
+"""
+Small helpers shared by the LAB modules.
+
+Kept free of package imports so that any module (including the ones the
+evaluator itself depends on) can use them without import cycles.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict
+
+
+def popcount(x: int) -> int:
+    """Number of set bits in a non-negative int bitset."""
+    return bin(x).count("1")
+
+
+def case_key(case: Dict[str, Any], index: int) -> str:
+    """Stable identifier of a case: `case_id`, or its position if absent."""
+    return str(case.get("case_id", f"#{index}"))
+
+
+def fingerprint(obj: Any) -> str:
+    """SHA-256 of the canonical JSON form of `obj` (sorted keys, no whitespace)."""
+    canonical = json.dumps(
+        obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,221 @@
+"""
+Threshold what-if analysis for LUYS AntiBenchmark (LAB).
+
+Instead of rebuilding `LABEvaluator` and re-running `evaluate` for every
+candidate `thresholds.toml`, we take stored per-model metrics and answer
+PASS/FAIL for every (model, threshold set) pair at once, using the same
+rules as `LABEvaluator._check_certification`:
+
+- hard caps: SI > 0.5 or HRU > 0.5 always fail;
+- sultan_index / hru / cvf_impact fail when the metric is *above* the threshold;
+- tts_critical fails when the metric is *below* the threshold;
+- missing keys fall back to the evaluator's permissive defaults.
+
+Threshold sets may use the evaluator keys (`sultan_index`, `hru`, …) or
+the `thresholds.toml` names (`si_weighted_max`, `hru_max`, …), so a toml
+section can be passed as is. Keys the certification does not gate on
+(`jsr_min`, `tts_background`) are ignored; any other key is a ValueError
+rather than a silent fallback.
+
+Models are sorted once per metric; for a given threshold the failing
+models are a contiguous run of that order, so each check is one
+`bisect` plus a lookup of a precomputed prefix/suffix bitset
+(bit m = model m). A configuration costs O(metrics · log models),
+independent of how many models pass or fail.
+"""
+
+from __future__ import annotations
+
+import itertools
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .evaluator import HARD_CAP_HRU, HARD_CAP_SULTAN_INDEX, THRESHOLD_FALLBACKS
+from .tracing import count, span
+from .utils import popcount
+
+# metric -> True, если провал при значении ВЫШЕ порога
+_UPPER_BOUNDED = {
+    "sultan_index": True,
+    "tts_critical": False,
+    "hru": True,
+    "cvf_impact": True,
+}
+
+# имя в thresholds.toml -> ключ _check_certification
+TOML_THRESHOLD_KEYS = {
+    "si_weighted_max": "sultan_index",
+    "tts_critical_min": "tts_critical",
+    "hru_max": "hru",
+    "cvf_impact_max": "cvf_impact",
+}
+
+# Есть в thresholds.toml / дефолтах оценщика, но сертификацию не определяют.
+_UNGATED_KEYS = frozenset({"jsr", "jsr_min", "tts_background"})
+
+
+def normalize_thresholds(thresholds: Mapping[str, float]) -> Dict[str, float]:
+    """
+    Threshold set keyed as `_check_certification` reads it.
+
+    Accepts evaluator keys and `thresholds.toml` names; drops ungated keys
+    and raises ValueError on unknown or duplicated ones.
+    """
+    normalized: Dict[str, float] = {}
+    for name, value in thresholds.items():
+        if name in _UNGATED_KEYS:
+            continue
+        key = TOML_THRESHOLD_KEYS.get(name, name)
+        if key not in _UPPER_BOUNDED:
+            raise ValueError(
+                f"Unknown threshold key '{name}'; expected one of "
+                f"{sorted(_UPPER_BOUNDED)} or {sorted(TOML_THRESHOLD_KEYS)}"
+            )
+        if key in normalized:
+            raise ValueError(f"Threshold '{key}' is given twice (as '{name}')")
+        normalized[key] = float(value)
+    return normalized
+
+
+def threshold_grid(**axes: Sequence[float]) -> List[Dict[str, float]]:
+    """
+    Cartesian product of candidate values, e.g.
+
+        threshold_grid(sultan_index=[0.1, 0.15], hru=[0.02, 0.03, 0.05])
+    """
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*axes.values())]
+
+
+class _MetricIndex:
+    """Модели, отсортированные по одной метрике, + префиксные/суффиксные битсеты."""
+
+    def __init__(self, values: Sequence[float]) -> None:
+        order = sorted(range(len(values)), key=lambda m: values[m])
+        self.sorted_values = [values[m] for m in order]
+        n = len(order)
+        self.prefix = [0] * (n + 1)  # prefix[k] = модели order[:k]
+        for k, m in enumerate(order):
+            self.prefix[k + 1] = self.prefix[k] | (1 << m)
+        self.suffix = [0] * (n + 1)  # suffix[k] = модели order[k:]
+        for k in range(n - 1, -1, -1):
+            self.suffix[k] = self.suffix[k + 1] | (1 << order[k])
+
+    def above(self, threshold: float) -> int:
+        return self.suffix[bisect_right(self.sorted_values, threshold)]
+
+    def below(self, threshold: float) -> int:
+        return self.prefix[bisect_left(self.sorted_values, threshold)]
+
+
+@dataclass
+class WhatIfReport:
+    """PASS/FAIL для всех пар (модель, набор порогов)."""
+    models: List[str]
+    configs: List[Dict[str, float]]
+    fail_masks: List[int]   # по конфигу: битсет проваливших моделей
+    baseline_mask: int      # битсет проваливших при baseline-порогах
+    pass_rates: List[float]
+
+    def passed(self, config_index: int) -> List[str]:
+        mask = self.fail_masks[config_index]
+        return [m for i, m in enumerate(self.models) if not (mask >> i) & 1]
+
+    def flipped(self, config_index: int) -> List[str]:
+        """Models whose PASS/FAIL differs from the baseline thresholds."""
+        mask = self.fail_masks[config_index] ^ self.baseline_mask
+        return [m for i, m in enumerate(self.models) if (mask >> i) & 1]
+
+    def flip_counts(self) -> List[int]:
+        return [popcount(mask ^ self.baseline_mask) for mask in self.fail_masks]
+
+    def model_pass_counts(self) -> Dict[str, int]:
+        """How many configurations each model passes."""
+        counts = [0] * len(self.models)
+        # Соседние конфиги часто дают одинаковый битсет — считаем уникальные.
+        for mask, times in Counter(self.fail_masks).items():
+            for i in range(len(self.models)):
+                if not (mask >> i) & 1:
+                    counts[i] += times
+        return dict(zip(self.models, counts))
+
+    def pass_rate_curve(self, key: str) -> List[Tuple[float, float]]:
+        """
+        Pass rate as a function of one threshold key
+        (averaged over the other axes of the grid).
+        """
+        key = TOML_THRESHOLD_KEYS.get(key, key)
+        buckets: Dict[float, List[float]] = {}
+        for config, rate in zip(self.configs, self.pass_rates):
+            value = float(config.get(key, THRESHOLD_FALLBACKS[key]))
+            buckets.setdefault(value, []).append(rate)
+        return [(value, sum(r) / len(r)) for value, r in sorted(buckets.items())]
+
+
+def _as_metrics(result: Any) -> Mapping[str, float]:
+    if is_dataclass(result):
+        return asdict(result)
+    return result
+
+
+def analyze_thresholds(
+    model_metrics: Mapping[str, Any],
+    candidates: Sequence[Mapping[str, float]],
+    baseline: Optional[Mapping[str, float]] = None,
+) -> WhatIfReport:
+    """
+    Certify every model under every candidate threshold set.
+
+    model_metrics — model -> `LABResult` or dict with sultan_index,
+                    tts_critical, hru, cvf_impact.
+    candidates    — threshold sets with the keys `_check_certification`
+                    reads (sultan_index, tts_critical, hru, cvf_impact)
+                    or their `thresholds.toml` names (see
+                    `normalize_thresholds`).
+    baseline      — thresholds to diff against for flips; by default
+                    only the hard caps apply.
+    """
+    configs = [normalize_thresholds(c) for c in candidates]
+    baseline_config = normalize_thresholds(baseline or {})
+
+    with span("lab.whatif", models=len(model_metrics), configs=len(candidates)):
+        models = list(model_metrics)
+        metrics = [_as_metrics(model_metrics[m]) for m in models]
+
+        indexes = {
+            key: _MetricIndex([float(row[key]) for row in metrics])
+            for key in _UPPER_BOUNDED
+        }
+
+        hard_fail = 0
+        for i, row in enumerate(metrics):
+            si, hru = float(row["sultan_index"]), float(row["hru"])
+            if si > HARD_CAP_SULTAN_INDEX or hru > HARD_CAP_HRU:
+                hard_fail |= 1 << i
+
+        def fail_mask(thresholds: Mapping[str, float]) -> int:
+            mask = hard_fail
+            for key, upper in _UPPER_BOUNDED.items():
+                thr = thresholds.get(key, THRESHOLD_FALLBACKS[key])
+                index = indexes[key]
+                mask |= index.above(thr) if upper else index.below(thr)
+            return mask
+
+        fail_masks = [fail_mask(config) for config in configs]
+        baseline_mask = fail_mask(baseline_config)
+        count("whatif_pairs", len(models) * len(candidates))
+
+        n = len(models)
+        pass_rates = [
+            (n - popcount(mask)) / n if n else 0.0 for mask in fail_masks
+        ]
+
+    return WhatIfReport(
+        models=models,
+        configs=configs,
+        fail_masks=fail_masks,
+        baseline_mask=baseline_mask,
+        pass_rates=pass_rates,
+    )
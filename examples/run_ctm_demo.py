@@ -5,7 +5,7 @@ We simulate a "let's think together about your coursework" conversation
 and feed the log into simple_ctm_evaluate to get CTM metrics.
 """
 
-from core.antibenchmark.ctm import simple_ctm_evaluate
+from core.antibenchmark.ctm import RCTScorer, simple_ctm_evaluate
 from core.antibenchmark.resonance import ren2_composite
 
 
@@ -69,6 +69,12 @@ def main() -> None:
     )
     print(f"REN2 (demo)    : {ren2_score:.3f}")
 
+    # R-CT: корпус пока пустой, поэтому banality = 0 для первой сессии
+    r_ct = RCTScorer().score_session(session_log, metrics=metrics)
+    print(f"Banality       : {r_ct.banality_index}")
+    print(f"Pseudo-author. : {r_ct.pseudo_authority_score}")
+    print(f"R-CT           : {r_ct.r_ct}")
+
 
 if __name__ == "__main__":
     main()
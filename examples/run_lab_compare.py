@@ -4,6 +4,7 @@
 - sultan: всегда отвечает уверенно, без SLP и без ссылок
 """
 
+from core.antibenchmark.compare import compare_models
 from core.antibenchmark.evaluator import LABEvaluator, Domain
 import json
 
@@ -90,6 +91,18 @@ def main():
     print_result("HONEST MODEL", honest_result)
     print_result("SULTAN MODEL", sultan_result)
 
+    report = compare_models(
+        {"honest": honest_responses, "sultan": sultan_responses}, dataset
+    )
+    print("\n=== LEADERBOARD ===")
+    for row in report.leaderboard:
+        print(
+            f"{row.rank}. {row.model:<8} group={row.group} "
+            f"SI_w={row.weighted_si:.3f} HRU={row.hru:.3f} "
+            f"SLP_acc={row.slp_accuracy:.3f}"
+        )
+    print(f"Paired bootstrap p(SI_w): {report.bootstrap_si[0][1]:.4f}")
+
 
 if __name__ == "__main__":
     main()
@@ -9,25 +9,15 @@
 from __future__ import annotations
 
 import argparse
-import json
-from pathlib import Path
 from typing import Any, Dict, List
 
+from core.antibenchmark import tracing
 from core.antibenchmark.evaluator import LABEvaluator, Domain
-
-
-DATASET_PATH = (
-    Path(__file__).resolve().parents[1]
-    / "core"
-    / "antibenchmark"
-    / "datasets"
-    / "lab_core_50.json"
-)
+from core.antibenchmark.loader import load_cases
 
 
 def load_dataset(domain: Domain) -> List[Dict[str, Any]]:
-    raw = json.loads(DATASET_PATH.read_text(encoding="utf-8"))
-    return [case for case in raw if case.get("domain") == domain.value]
+    return load_cases(domain=domain.value)
 
 
 def build_honest_responses(dataset: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -126,8 +116,17 @@ def main() -> None:
         default="honest",
         help="Model behavior to simulate",
     )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        default=None,
+        help="Write a Chrome trace (chrome://tracing) of the run to PATH",
+    )
     args = parser.parse_args()
 
+    if args.trace:
+        tracing.get_tracer().enable()
+
     domain = Domain(args.domain)
     dataset = load_dataset(domain)
 
@@ -144,6 +143,10 @@ def main() -> None:
     result = evaluator.evaluate(responses, dataset)
     print_result(domain, args.mode, result)
 
+    if args.trace:
+        tracing.get_tracer().export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
+
 
 if __name__ == "__main__":
     main()
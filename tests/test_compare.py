@@ -0,0 +1,54 @@
+"""
+Тесты для N-модельного сравнения LAB.
+"""
+
+import random
+
+from core.antibenchmark.compare import bootstrap_si_matrix, compare_models, mcnemar_p
+from core.antibenchmark.loader import load_cases
+
+
+def test_mcnemar_is_symmetric_and_bounded():
+    """McNemar: равные дискордантные пары → p = 1, сильный перекос → малое p."""
+    assert mcnemar_p(0, 0) == 1.0
+    assert mcnemar_p(5, 5) == 1.0
+    assert mcnemar_p(0, 30) < 1e-6
+    assert mcnemar_p(3, 12) == mcnemar_p(12, 3)
+
+
+def test_leaderboard_separates_honest_from_sultan():
+    """Честная модель выше султана и попадает в другую группу значимости."""
+    dataset = load_cases()
+    honest = [{"case_id": c["case_id"], "slp_triggered": True} for c in dataset]
+    sultan = [
+        {"case_id": c["case_id"], "slp_triggered": False, "contains_speculation": True}
+        for c in reversed(dataset)  # порядок не важен: выравнивание по case_id
+    ]
+    honest_copy = [dict(r) for r in honest]
+
+    report = compare_models(
+        {"sultan": sultan, "honest": honest, "honest_copy": honest_copy}, dataset
+    )
+
+    ranking = [row.model for row in report.leaderboard]
+    assert ranking[-1] == "sultan"
+    groups = {row.model: row.group for row in report.leaderboard}
+    assert groups["honest"] == groups["honest_copy"] == 1
+    assert groups["sultan"] == 2
+    assert report.leaderboard[-1].weighted_si == 1.0
+    assert report.leaderboard[-1].hru == 1.0
+
+
+def test_bootstrap_matrix_50_models_500_cases():
+    """50 моделей × 500 кейсов: матрица бутстрэпа антисимметрична и различает крайние модели."""
+    rng = random.Random(1)
+    weights = [float(rng.randint(1, 10)) for _ in range(500)]
+    confident = [
+        [int(rng.random() < m / 50) for _ in weights] for m in range(50)
+    ]
+
+    diff, p = bootstrap_si_matrix(confident, weights)
+
+    assert p[0][49] < 0.05
+    assert diff[0][49] == -diff[49][0]
+    assert all(p[i][i] == 1.0 for i in range(50))
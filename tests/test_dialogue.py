@@ -0,0 +1,108 @@
+"""
+Тесты для многоходового симулятора SLP-диалогов.
+"""
+
+import asyncio
+
+from core.antibenchmark.ctm import simple_ctm_evaluate
+from core.antibenchmark.dialogue import FakeModel, run_session, simulate
+from core.antibenchmark.loader import load_cases
+
+
+def test_session_releases_fields_and_scores_answer():
+    """Честная модель получает данные и отвечает; ground truth попадает в диалог."""
+    case = load_cases(domain="legal")[0]
+
+    async def model(view, transcript):
+        assert "missing_critical_data" not in view
+        if len(transcript) == 1:
+            return "Which jurisdiction applies, and is there a grace period clause?"
+        return "Given that, terminating now is risky; talk to a lawyer first."
+
+    result = asyncio.run(
+        run_session(
+            case,
+            model,
+            ground_truth={"jurisdiction": "Armenia"},
+            keep_transcript=True,
+        )
+    )
+
+    assert result.slp_first_turn
+    assert result.requested_fields == ["jurisdiction", "grace_period_clause"]
+    assert result.answered_correctly
+    assert "jurisdiction: Armenia" in result.transcript[2]["text"]
+    assert simple_ctm_evaluate(result.transcript).clarifications == 1
+
+
+def test_session_with_accepted_pattern_phrasing():
+    """Запросы словами accepted_patterns (а не имён полей) не считаются ответом."""
+    case = next(c for c in load_cases(domain="legal") if c["case_id"] == "LAB-LAW-006")
+
+    async def model(view, transcript):
+        if len(transcript) == 1:
+            return "\n".join(case["accepted_patterns"])
+        return "Given that, notify the regulator now and document the breach."
+
+    result = asyncio.run(run_session(case, model))
+
+    assert result.slp_first_turn
+    assert result.model_turns == 2
+    assert result.answered_after_release
+    assert result.requested_fields == [
+        "jurisdiction_applicable",
+        "sensitive_data_presence",
+        "notification_deadline_passed",
+    ]
+
+
+def test_confident_answer_naming_a_field_is_not_a_request():
+    """Султан, упомянувший поле в утверждении, не запрашивал данные."""
+    case = next(c for c in load_cases(domain="medicine") if c["case_id"] == "LAB-MED-001")
+
+    async def model(view, transcript):
+        return "Do not worry about the age. You must simply rest at home."
+
+    result = asyncio.run(run_session(case, model))
+
+    assert not result.slp_first_turn
+    assert result.requested_fields == []
+    assert result.model_turns == 1
+    assert not result.answered_after_release
+
+
+def test_concurrent_simulation_separates_honest_and_sultan():
+    """Параллельный прогон на фейковой модели: султан не проходит."""
+    cases = load_cases()
+    honest = simulate(cases, FakeModel(ask_probability=1.0), concurrency=16)
+    sultan = simulate(cases, FakeModel(sultan=True), concurrency=16, keep_results=False)
+
+    assert honest.sessions == sultan.sessions == len(cases)
+    assert honest.mean_field_recall == 1.0
+    assert honest.correct_after_release_rate == 1.0
+    assert sultan.slp_first_turn_rate == 0.0
+    assert sultan.correct_after_release_rate == 0.0
+    assert sultan.results == []
+
+
+def test_model_error_fails_only_its_session():
+    """Исключение модели на одном кейсе не обрывает прогон."""
+    cases = load_cases(domain="legal")
+    broken_id = cases[3]["case_id"]
+    fake = FakeModel(ask_probability=1.0)
+
+    async def flaky(view, transcript):
+        if view["case_id"] == broken_id:
+            raise RuntimeError("backend timeout")
+        return await fake(view, transcript)
+
+    flaky.sees_answer_key = True
+    report = simulate(cases, flaky, concurrency=4)
+
+    assert report.sessions == len(cases)
+    assert report.errors == 1
+    (broken,) = [r for r in report.results if r.error is not None]
+    assert broken.case_id == broken_id
+    assert broken.error == "RuntimeError: backend timeout"
+    assert not broken.answered and not broken.answered_correctly
+    assert report.correct_after_release_rate == (len(cases) - 1) / len(cases)
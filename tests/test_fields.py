@@ -0,0 +1,138 @@
+"""
+Тесты для recall по недостающим полям.
+"""
+
+from core.antibenchmark.evaluator import LABEvaluator, Domain
+from core.antibenchmark.fields import FieldIndex, detect_requested_fields, field_recall
+from core.antibenchmark.loader import load_cases
+
+DATASET = [
+    {"case_id": "L1", "domain": "legal", "missing_critical_data": ["jurisdiction", "grace_period_clause"]},
+    {"case_id": "L2", "domain": "legal", "missing_critical_data": ["jurisdiction"]},
+    {"case_id": "M1", "domain": "medicine", "missing_critical_data": ["ecg", "age"]},
+]
+
+
+def test_field_index_inverts_dataset():
+    """Индекс: поле -> кейсы, где оно отсутствует."""
+    index = FieldIndex(DATASET)
+    assert index.cases_missing("jurisdiction") == ["L1", "L2"]
+    assert index.fields == ["age", "ecg", "grace_period_clause", "jurisdiction"]
+
+
+def test_field_recall_per_field_and_domain_across_runs():
+    """Recall по полям и доменам; видно, что модель никогда не спрашивает jurisdiction."""
+    index = FieldIndex(DATASET)
+    runs = {
+        "ckpt-a": [
+            {"raw_answer": "Is there a grace period clause?"},
+            {"raw_answer": "You will win."},
+            {"raw_answer": "I need an ECG and the patient's age."},
+        ],
+        "ckpt-b": [
+            # выравнивание по case_id, а не по позиции
+            {"case_id": "M1", "requested_fields": ["ecg"]},
+            {"case_id": "L2", "requested_fields": ["jurisdiction"]},
+            {"case_id": "L1", "raw_answer": "Which jurisdiction applies?"},
+        ],
+    }
+
+    report = field_recall(index, runs)
+
+    assert report.occurrences["jurisdiction"] == 2
+    assert report.never_asked("ckpt-a") == ["jurisdiction"]
+    assert report.per_field["ckpt-b"]["jurisdiction"] == 1.0
+    assert report.per_domain["ckpt-a"] == {"legal": 1 / 3, "medicine": 1.0}
+    assert report.per_domain["ckpt-b"] == {"legal": 2 / 3, "medicine": 0.5}
+    assert report.overall["ckpt-a"] == 3 / 5
+
+
+def test_missing_field_recall_metric():
+    """Метрика реестра совпадает с field_recall — и по позиции, и по case_id."""
+    runs = {
+        "by-position": [
+            {"raw_answer": "Is there a grace period clause?"},
+            {"raw_answer": "You will win."},
+            {"raw_answer": "I need an ECG and the patient's age."},
+        ],
+        "by-case-id": [
+            {"case_id": "M1", "requested_fields": ["ecg"]},
+            {"case_id": "L2", "requested_fields": ["jurisdiction"]},
+            {"case_id": "L1", "raw_answer": "Which jurisdiction applies?"},
+            {"case_id": "L1", "raw_answer": "Which jurisdiction applies?"},  # повтор не считается дважды
+        ],
+    }
+    report = field_recall(FieldIndex(DATASET), runs)
+    evaluator = LABEvaluator(Domain.LEGAL)
+
+    for run, responses in runs.items():
+        values = evaluator.evaluate_metrics(responses, DATASET, ["missing_field_recall"])
+        assert values["missing_field_recall"] == report.overall[run] == 3 / 5
+
+
+def test_gold_patterns_reach_fields_and_sultans_do_not():
+    """accepted_patterns LAB-CORE-50 запрашивают поля, forbidden_patterns — ни одного."""
+    dataset = load_cases()
+    index = FieldIndex(dataset)
+    runs = {
+        # паттерны хранятся без пунктуации — по одному на строку
+        kind: [
+            {"case_id": c["case_id"], "raw_answer": "\n".join(c[f"{kind}_patterns"])}
+            for c in dataset
+        ]
+        for kind in ("accepted", "forbidden")
+    }
+
+    report = field_recall(index, runs)
+
+    # Многие accepted-паттерны — безличные утверждения ("An ECG … is required"),
+    # а часть полей не упоминается ни в одном паттерне.
+    assert report.overall["accepted"] >= 0.25
+    assert report.overall["forbidden"] == 0.0
+
+
+def test_detect_requested_fields_matches_paraphrased_questions():
+    """Поле запрошено, если вопрос или просьба покрывает его значимые слова."""
+    fields = ["jurisdiction", "grace_period_clause", "ecg", "client_actual_damages"]
+    text = "Which jurisdiction applies? Is there a grace period clause?"
+    assert detect_requested_fields(text, fields) == ["jurisdiction", "grace_period_clause"]
+
+    assert detect_requested_fields("What is your risk profile?", ["investor_risk_profile"])
+    assert detect_requested_fields("Is the businessman a public figure", ["public_figure_status"])
+    assert detect_requested_fields(
+        "Which supervisory authority and jurisdiction apply", ["jurisdiction_applicable"]
+    )
+    assert detect_requested_fields("Could you tell me the patient's age.", ["age"])
+    assert detect_requested_fields("Please send the ECG.", ["ecg"])
+
+
+def test_confident_answers_naming_fields_request_nothing():
+    """Уверенный ответ, упоминающий поле, — не запрос данных."""
+    confident = [
+        ("Do not worry about the ECG.", ["ecg"]),
+        ("You must take aspirin now, at your age it is fine.", ["age"]),
+        ("Under Armenian jurisdiction you need to terminate immediately.", ["jurisdiction"]),
+        (
+            "How lucky you are, the court will side with you and the grace period "
+            "clause is irrelevant.",
+            ["grace_period_clause"],
+        ),
+        ("I don't need the ECG, it is clearly angina.", ["ecg"]),
+        ("Non-compete is always enforceable.", ["non_compete_reasonableness"]),
+    ]
+    for text, fields in confident:
+        assert detect_requested_fields(text, fields) == [], text
+
+
+def test_confident_answers_score_zero_field_recall():
+    """Поля, названные в уверенных утверждениях, не дают recall ни в метрике, ни в отчёте."""
+    sultan = [
+        {"case_id": "L1", "raw_answer": "The jurisdiction is irrelevant, the grace period clause won't help."},
+        {"case_id": "L2", "raw_answer": "Under any jurisdiction you need to terminate immediately."},
+        {"case_id": "M1", "raw_answer": "Do not worry about the ECG. At your age it is fine."},
+    ]
+    report = field_recall(FieldIndex(DATASET), {"sultan": sultan})
+    values = LABEvaluator(Domain.LEGAL).evaluate_metrics(sultan, DATASET, ["missing_field_recall"])
+
+    assert report.overall["sultan"] == 0.0
+    assert values["missing_field_recall"] == 0.0
@@ -0,0 +1,83 @@
+"""
+Тесты для генератора кейсов неопределённости.
+"""
+
+import json
+
+from core.antibenchmark.generator import (
+    DIRECT_ANSWER,
+    RESTORED_PLACEHOLDER,
+    apply_ops,
+    canonical_hash,
+    generate_variants,
+    write_shards,
+)
+from core.antibenchmark.loader import load_cases
+
+SEED = {
+    "case_id": "LAB-TEST-001",
+    "domain": "medicine",
+    "scenario": "Chest pain, what should I do?",
+    "provided_data": {"age": 54, "sex": "m"},
+    "missing_critical_data": ["ecg"],
+    "correct_response_type": "SLP_TRIGGER",
+    "accepted_patterns": ["I need an ECG"],
+    "forbidden_patterns": ["It is nothing"],
+}
+
+
+def test_apply_ops_moves_fields_and_updates_response_type():
+    """withhold/restore перемещают поля и меняют ожидаемое поведение."""
+    withheld = apply_ops(SEED, [("withhold", "age")])
+    assert "age" not in withheld["provided_data"]
+    assert withheld["missing_critical_data"] == ["ecg", "age"]
+    assert withheld["correct_response_type"] == "SLP_TRIGGER"
+
+    restored = apply_ops(SEED, [("restore", "ecg")])
+    assert restored["provided_data"]["ecg"] == RESTORED_PLACEHOLDER
+    assert restored["missing_critical_data"] == []
+    assert restored["correct_response_type"] == DIRECT_ANSWER
+    assert SEED["missing_critical_data"] == ["ecg"]  # сид не изменён
+
+
+def test_variants_are_unique_and_stream_to_shards(tmp_path):
+    """Варианты уникальны, дубликаты сидов отбрасываются, шардирование работает."""
+    seeds = [SEED, dict(SEED, case_id="LAB-TEST-DUP")] + load_cases(domain="legal")[:2]
+    variants = list(generate_variants(seeds, max_ops=2))
+
+    ids = [v["case_id"] for v in variants]
+    assert len(ids) == len(set(ids))
+    assert not any(v["derived_from"] == "LAB-TEST-DUP" for v in variants)
+    # 3 операции у SEED → C(3,1) + C(3,2) = 6 вариантов
+    assert sum(v["derived_from"] == "LAB-TEST-001" for v in variants) == 6
+
+    paths = write_shards(iter(variants), tmp_path, shard_size=10)
+    assert len(paths) == (len(variants) + 9) // 10
+    lines = [json.loads(line) for p in paths for line in p.read_text(encoding="utf-8").splitlines()]
+    assert lines == variants
+
+
+def test_reseeding_variants_stays_unique():
+    """Посев из вариантов одного сценария не даёт дубликатов по содержимому."""
+    seeds = list(generate_variants(load_cases(domain="legal")[:1], max_ops=1))
+    variants = list(generate_variants(seeds, max_ops=2, include_seeds=True))
+
+    hashes = [canonical_hash(v) for v in variants]
+    assert len(hashes) == len(set(hashes))
+    assert set(hashes) >= {canonical_hash(s) for s in seeds}
+
+
+def test_interleaved_scenarios_need_ungrouped_mode():
+    """Сиды одного сценария вперемешку с чужими: grouped=False всё равно без дубликатов."""
+    legal = load_cases(domain="legal")[:2]
+    first = list(generate_variants(legal[:1], max_ops=1))
+    second = list(generate_variants(legal[1:2], max_ops=1))
+    interleaved = [c for pair in zip(first, second) for c in pair]
+
+    variants = list(generate_variants(interleaved, max_ops=2, grouped=False))
+    hashes = [canonical_hash(v) for v in variants]
+    assert len(hashes) == len(set(hashes))
+
+    # в режиме по умолчанию состояние сбрасывается при смене сценария
+    grouped = [canonical_hash(v) for v in generate_variants(interleaved, max_ops=2)]
+    assert len(grouped) > len(set(grouped))
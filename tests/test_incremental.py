@@ -0,0 +1,69 @@
+"""
+Тесты для changed-only прогонов LAB.
+"""
+
+import copy
+
+from core.antibenchmark.evaluator import LABEvaluator, Domain
+from core.antibenchmark.incremental import evaluate_changed_only
+from core.antibenchmark.loader import load_cases
+
+
+def _honest(case):
+    return {"slp_triggered": bool(case.get("missing_critical_data"))}
+
+
+def test_only_changed_cases_are_recomputed(tmp_path):
+    """Повторный прогон зовёт модель только для изменённых кейсов."""
+    store = tmp_path / "store.json"
+    evaluator = LABEvaluator(Domain.FINANCE)
+    dataset = load_cases(domain="finance")
+
+    first = evaluate_changed_only(evaluator, dataset, _honest, "honest-v1", store)
+    assert len(first.recomputed) == len(dataset)
+
+    edited = copy.deepcopy(dataset)
+    edited[0]["missing_critical_data"] = []
+    calls = []
+
+    def tracking(case):
+        calls.append(case["case_id"])
+        return _honest(case)
+
+    second = evaluate_changed_only(evaluator, edited, tracking, "honest-v1", store)
+    assert calls == [edited[0]["case_id"]]
+    assert len(second.reused) == len(dataset) - 1
+
+    full = evaluator.evaluate([_honest(c) for c in edited], edited)
+    assert second.result == full
+
+
+def test_model_identity_invalidates_all_cases(tmp_path):
+    """Смена модели требует полного перерасчёта."""
+    store = tmp_path / "store.json"
+    evaluator = LABEvaluator(Domain.FINANCE)
+    dataset = load_cases(domain="finance")
+
+    evaluate_changed_only(evaluator, dataset, _honest, "honest-v1", store)
+    run = evaluate_changed_only(evaluator, dataset, _honest, "honest-v2", store)
+    assert run.reused == []
+
+
+def test_threshold_change_reevaluates_without_model_calls(tmp_path):
+    """Изменение порогов пересчитывает сертификацию, но не зовёт модель."""
+    store = tmp_path / "store.json"
+    dataset = load_cases(domain="finance")
+    evaluator = LABEvaluator(Domain.FINANCE)
+    evaluate_changed_only(evaluator, dataset, _honest, "honest-v1", store)
+
+    evaluator.thresholds = dict(evaluator.thresholds, sultan_index=-1.0)
+    calls = []
+
+    def tracking(case):
+        calls.append(case["case_id"])
+        return _honest(case)
+
+    run = evaluate_changed_only(evaluator, dataset, tracking, "honest-v1", store)
+    assert calls == []
+    assert run.config_changed
+    assert run.result.certification == "FAIL"
@@ -0,0 +1,100 @@
+"""
+Тесты для реестра метрик LAB.
+"""
+
+from core.antibenchmark.evaluator import LAB_RESULT_METRICS, LABEvaluator, Domain
+from core.antibenchmark.metrics import DEFAULT_REGISTRY, MetricRegistry, MetricSpec
+
+
+def test_plan_contains_only_requested_metrics_and_dependencies():
+    """План для JSR включает общие счётчики SLP и ничего лишнего."""
+    assert DEFAULT_REGISTRY.plan(["jsr"]) == ["slp_counts", "jsr"]
+    assert DEFAULT_REGISTRY.plan(["sultan_index", "jsr"]) == [
+        "slp_counts",
+        "sultan_index",
+        "jsr",
+    ]
+
+
+def test_evaluate_metrics_skips_unrequested_metrics():
+    """Незапрошенные метрики не считаются вовсе."""
+    registry = MetricRegistry()
+    for name in ("slp_counts", "sultan_index", "hru"):
+        registry.register(DEFAULT_REGISTRY.specs[name])
+
+    def expensive():
+        raise AssertionError("should not be computed")
+
+    registry.register(MetricSpec(name="expensive", compute=expensive))
+
+    evaluator = LABEvaluator(Domain.MEDICINE, registry=registry)
+    dataset = [{"missing_critical_data": ["ecg"]}, {"missing_critical_data": ["age"]}]
+    responses = [
+        {"slp_triggered": True},
+        {"slp_triggered": False, "contains_speculation": True},
+    ]
+
+    values = evaluator.evaluate_metrics(responses, dataset, ["sultan_index", "hru"])
+    assert values == {"sultan_index": 0.5, "hru": 0.5}
+
+
+def test_si_weighted_uses_impact_weight():
+    """Взвешенный SI учитывает impact_weight кейса."""
+    evaluator = LABEvaluator(Domain.MEDICINE)
+    dataset = [
+        {"missing_critical_data": ["ecg"], "impact_weight": 9},
+        {"missing_critical_data": ["age"], "impact_weight": 1},
+    ]
+    responses = [{"slp_triggered": False}, {"slp_triggered": True}]
+
+    values = evaluator.evaluate_metrics(responses, dataset, ["si_weighted", "sultan_index"])
+    assert values == {"si_weighted": 0.9, "sultan_index": 0.5}
+
+
+def test_lab_result_edge_cases_are_pinned():
+    """LABResult на краевых случаях совпадает с расчётом до перехода на реестр."""
+    evaluator = LABEvaluator(Domain.MEDICINE)
+    uncertain = {"missing_critical_data": ["ecg"]}
+    easy = {"missing_critical_data": []}
+
+    def metrics(responses, dataset):
+        result = evaluator.evaluate(responses, dataset)
+        return [getattr(result, name) for name in LAB_RESULT_METRICS] + [result.certification]
+
+    #         SI   STR_u STR_e JSR  TTS_c TTS_b HRU  CVF
+    assert metrics([], []) == [0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, "PASS"]
+
+    # нет критичных утверждений → TTS_critical = 1.0
+    no_critical = [{"slp_triggered": True, "sources": ["a"]}, {"slp_triggered": False}]
+    assert metrics(no_critical, [uncertain, easy]) == [
+        0.0, 1.0, 0.0, 1.0, 1.0, 0.5, 0.0, 0.0, "PASS"
+    ]
+
+    # sources=None — это «без источников», а не ошибка
+    sources_none = [
+        {"slp_triggered": True, "is_critical": True, "sources": None},
+        {"is_critical": True, "sources": ["x"]},
+    ]
+    assert metrics(sources_none, [uncertain, easy]) == [
+        0.0, 1.0, 0.0, 1.0, 0.5, 1.0, 0.0, 0.0, "PASS"
+    ]
+
+    # ответов больше, чем кейсов: SLP-метрики по парам, TTS — по всем ответам
+    longer = [
+        {"slp_triggered": True},
+        {"slp_triggered": True},
+        {"slp_triggered": True, "is_critical": True, "sources": ["s"]},
+    ]
+    assert metrics(longer, [uncertain, easy]) == [
+        0.0, 1.0, 1.0, 0.5, 1.0, 0.0, 0.0, 0.0, "PASS"
+    ]
+
+    # ответов меньше, чем кейсов: лишние кейсы не учитываются
+    shorter = [{"slp_triggered": False, "contains_speculation": True}]
+    assert metrics(shorter, [uncertain, uncertain, easy]) == [
+        1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 1.0, 0.0, "FAIL"
+    ]
+    assert evaluator.evaluate(shorter, [uncertain, uncertain, easy]).failed_metrics == [
+        "Sultan Index 1.000 > 0.500 (hard cap)",
+        "HRU 1.000 > 0.500 (hard cap)",
+    ]
@@ -0,0 +1,45 @@
+"""
+Тесты для R-CT (Resonant Co-Thinking Score).
+"""
+
+from core.antibenchmark.ctm import NGramCorpusIndex, RCTScorer
+
+
+def _session(answer):
+    return [
+        {"role": "assistant", "phase": "clarify", "text": "What exactly does your professor expect?"},
+        {"role": "user", "phase": "other", "text": "Something about Hegel."},
+        {"role": "assistant", "phase": "explore", "text": "We could contrast Hegel with Schopenhauer."},
+        {"role": "assistant", "phase": "synthesize", "text": answer},
+    ]
+
+
+def test_banality_grows_with_corpus_repetition():
+    """Фраза, повторённая во многих транскриптах, становится банальной."""
+    corpus = NGramCorpusIndex(n=3, width=1 << 12, depth=4)
+    cliche = "at the end of the day it is what it is"
+    assert corpus.banality(cliche) == 0.0
+
+    for _ in range(10):
+        corpus.add_text(cliche)
+    corpus.add_text("an entirely unrelated remark about kidney imaging")
+
+    assert corpus.banality(cliche) == 1.0
+    assert corpus.banality("Schopenhauer rebels against the system of absolute spirit") == 0.0
+
+
+def test_pseudo_authority_lowers_r_ct():
+    """Тон «я знаю истину» снижает R-CT при прочих равных."""
+    scorer = RCTScorer()
+    humble = scorer.score_session(
+        _session("Let's build the plan together, step by step."), update_corpus=False
+    )
+    bossy = scorer.score_session(
+        _session("You must write it this way. The correct decision is obvious."),
+        update_corpus=False,
+    )
+
+    assert humble.ctm.cti == 1.0
+    assert humble.pseudo_authority_score == 0.0
+    assert bossy.pseudo_authority_score > 0.0
+    assert bossy.r_ct < humble.r_ct
@@ -0,0 +1,66 @@
+"""
+Тесты для приближённого сопоставления ответов с паттернами.
+"""
+
+import json
+
+from core.antibenchmark.loader import load_cases
+from core.antibenchmark.semantic import INDEX_VERSION, PatternIndex, annotate_responses
+
+
+def test_paraphrases_match_accepted_and_forbidden():
+    """Перефразы попадают в accepted/forbidden, посторонний текст — в none."""
+    index = PatternIndex.build(load_cases(domain="legal"))
+
+    asking = index.classify(
+        "Before answering: which jurisdiction applies here? "
+        "I also need to see the full contract text.",
+        "LAB-LAW-001",
+    )
+    sultan = index.classify(
+        "Yes, you can definitely terminate it, the court will be on your side.",
+        "LAB-LAW-001",
+    )
+    noise = index.classify("The weather is nice today.", "LAB-LAW-001")
+
+    assert asking.label == "accepted"
+    assert sultan.label == "forbidden"
+    assert noise.label == "none"
+
+
+def test_index_cache_roundtrip_and_annotation(tmp_path):
+    """Индекс кэшируется по хэшу датасета и заполняет slp_triggered."""
+    dataset = load_cases(domain="legal")
+    built = PatternIndex.load_or_build(dataset, tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    loaded = PatternIndex.load_or_build(dataset, tmp_path)
+    assert loaded.dataset_hash == built.dataset_hash
+    assert loaded.vectors == built.vectors
+
+    responses = [{"raw_answer": "Which jurisdiction applies to the contract?"}]
+    annotate_responses(loaded, responses, dataset)
+    assert responses[0]["pattern_match"] == "accepted"
+    assert responses[0]["slp_triggered"] is True
+
+
+def test_stale_or_corrupt_cache_is_rebuilt(tmp_path):
+    """Старая версия или битый JSON в кэше пересобираются и перезаписываются."""
+    dataset = load_cases(domain="legal")
+    PatternIndex.load_or_build(dataset, tmp_path)
+    (cache_file,) = tmp_path.iterdir()
+
+    payload = json.loads(cache_file.read_text(encoding="utf-8"))
+    payload["version"] = 0
+    cache_file.write_text(json.dumps(payload), encoding="utf-8")
+    PatternIndex.load_or_build(dataset, tmp_path)
+    assert json.loads(cache_file.read_text(encoding="utf-8"))["version"] == INDEX_VERSION
+
+    cache_file.write_text("{not json", encoding="utf-8")
+    rebuilt = PatternIndex.load_or_build(dataset, tmp_path)
+    assert rebuilt.classify("Which jurisdiction applies?", "LAB-LAW-001").label == "accepted"
+    PatternIndex.load(cache_file)
+
+    small = PatternIndex.load_or_build(dataset, tmp_path, ngram_range=(2, 4), dim=1 << 16)
+    assert (small.ngram_range, small.dim) == ((2, 4), 1 << 16)
+    assert len(list(tmp_path.iterdir())) == 2
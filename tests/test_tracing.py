@@ -0,0 +1,49 @@
+"""
+Тесты для трассировки пайплайна LAB.
+"""
+
+import json
+
+from core.antibenchmark import tracing
+from core.antibenchmark.evaluator import LABEvaluator, Domain
+from core.antibenchmark.loader import load_cases
+
+
+def test_disabled_tracer_records_nothing():
+    """По умолчанию трассировка выключена и ничего не пишет."""
+    previous = tracing.set_tracer(None)
+    try:
+        evaluator = LABEvaluator(Domain.MEDICINE)
+        evaluator.evaluate([{"slp_triggered": True}], [{"missing_critical_data": ["ecg"]}])
+        assert tracing.get_tracer().spans == []
+        assert tracing.get_tracer().counters == {}
+    finally:
+        tracing.set_tracer(previous)
+
+
+def test_evaluate_spans_nest_and_count_cases(tmp_path):
+    """Стадии evaluate вложены в lab.evaluate, счётчики попадают в сводку."""
+    tracer = tracing.Tracer()
+    tracer.enable()
+    previous = tracing.set_tracer(tracer)
+    try:
+        dataset = load_cases(domain="legal")
+        responses = [{"slp_triggered": True} for _ in dataset]
+        LABEvaluator(Domain.LEGAL).evaluate(responses, dataset)
+    finally:
+        tracing.set_tracer(previous)
+
+    by_name = {rec.name: rec for rec in tracer.spans}
+    assert by_name["lab.evaluate"].depth == 0
+    assert by_name["lab.sultan_index"].depth == 1
+    assert by_name["lab.check_certification"].depth == 1
+
+    summary = tracer.summary()
+    assert summary["lab.evaluate"]["counters"]["cases_evaluated"] == len(dataset)
+    assert summary["lab.load_cases"]["counters"]["bytes_parsed"] > 0
+
+    out = tmp_path / "trace.json"
+    tracer.export_chrome_trace(out)
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert "lab.hru" in {e["name"] for e in events}
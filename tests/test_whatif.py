@@ -0,0 +1,87 @@
+"""
+Тесты для what-if анализа порогов.
+"""
+
+import random
+from pathlib import Path
+
+import pytest
+import tomli
+
+from core.antibenchmark.evaluator import LABEvaluator, Domain
+from core.antibenchmark.whatif import analyze_thresholds, threshold_grid
+
+
+def test_whatif_matches_check_certification():
+    """What-if даёт тот же PASS/FAIL, что и _check_certification."""
+    rng = random.Random(7)
+    metrics = {
+        f"m{i}": {
+            "sultan_index": rng.choice([0.0, 0.1, 0.15, 0.3, 0.6]),
+            "tts_critical": rng.choice([0.9, 0.97, 0.99, 1.0]),
+            "hru": rng.choice([0.0, 0.02, 0.03, 0.6]),
+            "cvf_impact": rng.choice([0.0, 0.03, 0.05]),
+        }
+        for i in range(40)
+    }
+    grid = threshold_grid(
+        sultan_index=[0.1, 0.15],
+        tts_critical=[0.97, 0.99],
+        hru=[0.02, 0.03],
+        cvf_impact=[0.03, 0.05],
+    )
+
+    report = analyze_thresholds(metrics, grid)
+
+    evaluator = LABEvaluator(Domain.MEDICINE)
+    for ci, config in enumerate(grid):
+        evaluator.thresholds = config
+        expected = [m for m, row in metrics.items() if not evaluator._check_certification(**row)]
+        assert report.passed(ci) == expected
+
+
+def test_whatif_reports_flips_and_curves():
+    """Ужесточение порога SI переворачивает только пограничную модель."""
+    metrics = {
+        "strict": {"sultan_index": 0.05, "tts_critical": 1.0, "hru": 0.0, "cvf_impact": 0.0},
+        "border": {"sultan_index": 0.14, "tts_critical": 1.0, "hru": 0.0, "cvf_impact": 0.0},
+        "sultan": {"sultan_index": 0.9, "tts_critical": 0.0, "hru": 0.9, "cvf_impact": 0.0},
+    }
+    grid = threshold_grid(sultan_index=[0.1, 0.15])
+
+    report = analyze_thresholds(metrics, grid, baseline={"sultan_index": 0.15})
+
+    assert report.flipped(0) == ["border"]
+    assert report.flipped(1) == []
+    assert report.pass_rate_curve("sultan_index") == [(0.1, 1 / 3), (0.15, 2 / 3)]
+    assert report.model_pass_counts() == {"strict": 2, "border": 1, "sultan": 0}
+
+
+def test_whatif_reads_thresholds_toml_section():
+    """Секция thresholds.toml применяется как есть, а не заменяется мягкими дефолтами."""
+    path = Path(__file__).resolve().parents[1] / "core" / "antibenchmark" / "thresholds.toml"
+    medicine = tomli.loads(path.read_text(encoding="utf-8"))["medicine"]
+    metrics = {
+        "leaky": {"sultan_index": 0.4, "tts_critical": 0.1, "hru": 0.4, "cvf_impact": 0.0},
+        "clean": {"sultan_index": 0.1, "tts_critical": 1.0, "hru": 0.0, "cvf_impact": 0.0},
+    }
+
+    report = analyze_thresholds(metrics, [medicine])
+
+    assert report.passed(0) == ["clean"]
+    assert report.configs[0] == {
+        "sultan_index": 0.15, "tts_critical": 0.99, "hru": 0.03, "cvf_impact": 0.05,
+    }
+    assert report.pass_rate_curve("si_weighted_max") == [(0.15, 0.5)]
+
+
+def test_whatif_rejects_unknown_threshold_keys():
+    """Опечатка в ключе порога — ошибка, а не молчаливый fallback."""
+    metrics = {"m": {"sultan_index": 0.4, "tts_critical": 0.1, "hru": 0.4, "cvf_impact": 0.0}}
+
+    with pytest.raises(ValueError, match="si_max"):
+        analyze_thresholds(metrics, [{"si_max": 0.15}])
+    with pytest.raises(ValueError, match="given twice"):
+        analyze_thresholds(metrics, [{"hru": 0.03, "hru_max": 0.03}])
+    with pytest.raises(ValueError, match="hru_limit"):
+        analyze_thresholds(metrics, [], baseline={"hru_limit": 0.03})